@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'name', 'status', 'priority', 'attempts', 'run_at', 'created')
+    list_filter = ('status', 'name')
+    readonly_fields = ('claim_token', 'claimed_at', 'last_error', 'created')
+
+
+admin.site.register(Job, JobAdmin)
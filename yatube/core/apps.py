@@ -1,5 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .auth import forget_cached_user, refresh_cached_user
+        from .db_router import update_last_login
+        from .sqlite import tune_connection
+
+        connection_created.connect(tune_connection)
+        post_save.connect(
+            refresh_cached_user, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(
+            forget_cached_user, sender=settings.AUTH_USER_MODEL)
+        # Вход обновляет last_login: такая запись не закрепляет
+        # пользователя за primary, см. core.db_router.
+        if user_logged_in.disconnect(dispatch_uid="update_last_login"):
+            user_logged_in.connect(
+                update_last_login, dispatch_uid="update_last_login")
@@ -0,0 +1,47 @@
+import copy
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя запроса из кеша.
+
+    Кеш обновляется при каждом сохранении пользователя, в том числе
+    при входе (last_login) и смене пароля, см. `remember_user`.
+    """
+
+    def get_user(self, user_id):
+        user = cache.get(user_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            remember_user(user)
+        return user if self.user_can_authenticate(user) else None
+
+
+# Кеши прав ModelBackend на экземпляре пользователя: в общий кеш
+# они не попадают, права проверяются заново в каждом запросе.
+PERMISSION_CACHES = ("_perm_cache", "_user_perm_cache", "_group_perm_cache")
+
+
+def remember_user(user):
+    cached = copy.copy(user)
+    for name in PERMISSION_CACHES:
+        cached.__dict__.pop(name, None)
+    cache.set(user_key(user.pk), cached, settings.AUTH_USER_CACHE_TIMEOUT)
+
+
+def refresh_cached_user(sender, instance, raw, **kwargs):
+    if not raw:
+        remember_user(instance)
+
+
+def forget_cached_user(sender, instance, **kwargs):
+    cache.delete(user_key(instance.pk))
@@ -0,0 +1,188 @@
+import gc
+import math
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.db.models import Count
+from django.template.backends.django import Template
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from posts.models import Follow, Group, Post, User
+from posts.seed import DEFAULT_END, Seeder
+
+NAMESPACES = ("posts", "users", "about")
+# Эти адреса меняют данные или сессию даже на GET.
+SKIPPED = {"posts:profile_follow", "posts:profile_unfollow", "users:logout"}
+FOLLOWED_AUTHORS = 10
+
+
+def percentile(values, share):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(share * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def url_patterns(namespaces=NAMESPACES):
+    """Пары (имя, имена аргументов) адресов приложений."""
+    for resolver in get_resolver().url_patterns:
+        if (not isinstance(resolver, URLResolver)
+                or resolver.namespace not in namespaces):
+            continue
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                yield (
+                    f"{resolver.namespace}:{pattern.name}",
+                    list(pattern.pattern.converters))
+
+
+def busiest(queryset, field):
+    return (
+        queryset.order_by()
+        .values(field)
+        .annotate(n=Count("id"))
+        .order_by("-n")
+        .values_list(field, flat=True))
+
+
+def seed_dataset(posts, seed=0):
+    """Заполняет пустую базу и возвращает пользователя и аргументы адресов.
+
+    Замеры идут от имени самого активного автора, подписанного
+    на FOLLOWED_AUTHORS следующих за ним авторов.
+    """
+    seeder = Seeder(seed)
+    author_ids = seeder.create_users(max(10, posts // 50))
+    group_ids = seeder.create_groups(max(3, posts // 500))
+    seeder.create_posts(
+        posts, author_ids, group_ids, 0.2,
+        DEFAULT_END - timedelta(days=365), DEFAULT_END)
+    seeder.finish()
+
+    author_ids = list(busiest(Post.objects, "author")[:FOLLOWED_AUTHORS + 1])
+    user = User.objects.get(pk=author_ids[0])
+    for author_id in author_ids[1:]:
+        Follow.objects.create(user=user, author_id=author_id)
+    group = Group.objects.get(pk=busiest(
+        Post.objects.filter(group__isnull=False), "group")[0])
+    return user, {
+        "slug": group.slug,
+        "username": user.username,
+        "post_id": Post.objects.filter(author=user).values_list(
+            "pk", flat=True)[0],
+        "uidb64": urlsafe_base64_encode(force_bytes(user.pk)),
+        "token": default_token_generator.make_token(user),
+    }
+
+
+@contextmanager
+def render_timer():
+    """Собирает время отрисовки шаблонов, вызванных из представлений.
+
+    Виджеты форм тоже отрисовываются шаблонами внутри страницы,
+    поэтому учитываются только внешние вызовы.
+    """
+    spent = []
+    depth = [0]
+    render = Template.render
+
+    def timed_render(self, *args, **kwargs):
+        depth[0] += 1
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            depth[0] -= 1
+            if not depth[0]:
+                spent.append(time.perf_counter() - started)
+
+    with mock.patch.object(Template, "render", timed_render):
+        yield spent
+
+
+def fetch(client, path):
+    response = client.get(path)
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return response
+
+
+def measure(client, path, repeat, warmup):
+    for _ in range(warmup):
+        fetch(client, path)
+    latencies, renders, queries = [], [], []
+    # Как и timeit, сборщик мусора на время замеров выключается:
+    # его паузы иначе попадают в p95 случайных адресов.
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            with render_timer() as spent, \
+                    CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = fetch(client, path)
+                latencies.append(time.perf_counter() - started)
+            renders.append(sum(spent))
+            queries.append(len(captured))
+    finally:
+        gc.enable()
+    return {
+        "status": response.status_code,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "render_ms": round(statistics.median(renders) * 1000, 3),
+        "queries": max(queries),
+    }
+
+
+def run_dataset(user, kwargs, repeat=30, warmup=2, only=None):
+    """Замеры адресов для гостя и для вошедшего пользователя.
+
+    only ограничивает замеры ключами "<адрес> <клиент>".
+    """
+    clients = {"guest": Client(), "user": Client()}
+    clients["user"].force_login(user)
+    results = {}
+    for name, arguments in url_patterns():
+        if name in SKIPPED:
+            continue
+        path = reverse(name, kwargs={
+            argument: kwargs[argument] for argument in arguments})
+        for client_name, client in clients.items():
+            key = f"{name} {client_name}"
+            if only is None or key in only:
+                results[key] = measure(client, path, repeat, warmup)
+    return results
+
+
+def compare(results, baseline, threshold, min_ms):
+    """Регрессии results относительно baseline: (размер, адрес, описание).
+
+    p95 считается ухудшившимся, если вырос больше чем в 1 + threshold
+    раз и больше чем на min_ms; число запросов - при любом росте.
+    """
+    regressions = []
+    for size, views in results.items():
+        for view, current in views.items():
+            saved = baseline.get(size, {}).get(view)
+            if saved is None:
+                continue
+            if (current["p95_ms"] > saved["p95_ms"] * (1 + threshold)
+                    and current["p95_ms"] - saved["p95_ms"] > min_ms):
+                regressions.append((
+                    size, view,
+                    f"p95 {saved['p95_ms']} -> {current['p95_ms']} мс"))
+            if current["queries"] > saved["queries"]:
+                regressions.append((
+                    size, view,
+                    f"запросов {saved['queries']} -> {current['queries']}"))
+    return regressions
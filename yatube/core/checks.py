@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core import checks
+
+CACHED_SESSION_ENGINE = "core.sessions"
+CACHED_BACKEND = "core.auth.CachedModelBackend"
+
+
+@checks.register(checks.Tags.caches, checks.Tags.security)
+def check_shared_cache(app_configs, **kwargs):
+    """Сессии и пользователь из кеша требуют общего для процессов кеша.
+
+    Иначе выход и смена пароля сбрасывают кеш только одного процесса,
+    а остальные принимают старую сессию и старый хеш пароля.
+    """
+    cached = (
+        settings.SESSION_ENGINE == CACHED_SESSION_ENGINE
+        or CACHED_BACKEND in settings.AUTHENTICATION_BACKENDS)
+    backend = settings.CACHES["default"]["BACKEND"]
+    if not cached or backend not in settings.PROCESS_LOCAL_CACHES:
+        return []
+    return [checks.Error(
+        f"{backend} хранит значения в памяти одного процесса.",
+        hint=(
+            f"Укажите общий кеш в CACHES или верните SESSION_ENGINE "
+            f"и AUTHENTICATION_BACKENDS без {CACHED_SESSION_ENGINE} "
+            f"и {CACHED_BACKEND}."),
+        id="core.E001",
+    )]
@@ -0,0 +1,93 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = "default"
+# Служебные модели всегда читаются и пишутся на primary. Их запись
+# не закрепляет пользователя: вход и выход меняют только сессию.
+PRIMARY_MODELS = {"sessions.session"}
+
+# Читать с реплик можно только внутри запроса, который разрешил это
+# через `ReplicaPinMiddleware`; команды и фоновые задачи читают с primary.
+_replica_reads = ContextVar("replica_reads", default=False)
+_wrote = ContextVar("wrote", default=False)
+_bookkeeping = ContextVar("bookkeeping", default=False)
+
+
+def allow_replica_reads(allowed):
+    """Включает чтение с реплик, возвращает токены для `restore`."""
+    return _replica_reads.set(allowed), _wrote.set(False)
+
+
+def restore(tokens):
+    replica_token, wrote_token = tokens
+    _replica_reads.reset(replica_token)
+    _wrote.reset(wrote_token)
+
+
+def has_written():
+    return _wrote.get()
+
+
+@contextmanager
+def bookkeeping_writes():
+    """Записи внутри блока не закрепляют пользователя за primary."""
+    token = _bookkeeping.set(True)
+    try:
+        yield
+    finally:
+        _bookkeeping.reset(token)
+
+
+def update_last_login(sender, user, **kwargs):
+    """update_last_login из django.contrib.auth без закрепления."""
+    from django.contrib.auth import models
+
+    with bookkeeping_writes():
+        models.update_last_login(sender, user, **kwargs)
+
+
+@contextmanager
+def use_primary():
+    """Читает с primary внутри блока, например перед записью в кеш."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """Отправляет чтение на реплики из DATABASE_REPLICAS, запись на primary.
+
+    После первой записи запрос до конца читает с primary,
+    чтобы видеть собственные изменения. Закрепляют пользователя
+    только записи данных, а не сессии и last_login.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (not replicas or not _replica_reads.get()
+                or model._meta.label_lower in PRIMARY_MODELS):
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if (model._meta.label_lower not in PRIMARY_MODELS
+                and not _bookkeeping.get()):
+            _wrote.set(True)
+        _replica_reads.set(False)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
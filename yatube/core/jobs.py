@@ -0,0 +1,172 @@
+import json
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import metrics
+from .models import Job
+
+# Письма ждёт пользователь, рассылки по лентам - нет.
+HIGH = 10
+NORMAL = 0
+
+
+class UnknownTask(Exception):
+    pass
+
+
+def task(func):
+    """Разрешает ставить функцию в очередь через `enqueue`.
+
+    Функция по-прежнему вызывается и напрямую. Воркер выполняет
+    только помеченные функции, а не любую строку из таблицы.
+    """
+    func.is_job_task = True
+    return func
+
+
+def task_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def resolve(name):
+    try:
+        func = import_string(name)
+    except ImportError:
+        func = None
+    if not getattr(func, "is_job_task", False):
+        raise UnknownTask(f"{name} не является задачей")
+    return func
+
+
+def enqueue(func, *, priority=NORMAL, delay=0, max_attempts=None,
+            **kwargs):
+    """Ставит вызов func(**kwargs) в очередь.
+
+    Задача пишется в той же транзакции, что и остальные изменения
+    запроса: при откате она не выполнится.
+    """
+    if not getattr(func, "is_job_task", False):
+        raise UnknownTask(f"{task_name(func)} не является задачей")
+    return Job.objects.create(
+        name=task_name(func),
+        payload=json.dumps(kwargs, cls=DjangoJSONEncoder),
+        priority=priority,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+
+
+def claimable(now):
+    # Задачи упавшего воркера освобождаются через JOBS_CLAIM_TIMEOUT.
+    stale = now - timedelta(seconds=settings.JOBS_CLAIM_TIMEOUT)
+    return (
+        Q(status=Job.QUEUED, run_at__lte=now)
+        & (Q(claim_token__isnull=True) | Q(claimed_at__lt=stale)))
+
+
+def claim(limit):
+    """Захватывает до limit готовых задач, старшие приоритеты первыми.
+
+    SELECT ... LIMIT выбирает кандидатов, UPDATE с тем же условием
+    помечает их токеном воркера. Задачи, которые за это время забрал
+    другой воркер, условию уже не соответствуют и не помечаются.
+    Захват продлевается перед запуском каждой задачи в `run`, поэтому
+    JOBS_CLAIM_TIMEOUT должен превышать время самой долгой задачи.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    candidates = list(
+        Job.objects
+        .filter(claimable(now))
+        .order_by("-priority", "run_at", "id")
+        .values_list("id", flat=True)[:limit])
+    if not candidates:
+        return []
+    Job.objects.filter(claimable(now), id__in=candidates).update(
+        claim_token=token, claimed_at=now)
+    return list(
+        Job.objects
+        .filter(claim_token=token)
+        .order_by("-priority", "run_at", "id"))
+
+
+def retry_delay(attempts):
+    """Экспоненциальная пауза перед попыткой номер attempts + 1."""
+    delay = settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1)
+    return min(delay, settings.JOBS_RETRY_MAX_DELAY)
+
+
+def touch(job):
+    """Продлевает захват перед запуском задачи из пачки.
+
+    Ложь, если захват истёк и задачу уже забрал другой воркер.
+    """
+    return Job.objects.filter(
+        pk=job.pk, claim_token=job.claim_token,
+    ).update(claimed_at=timezone.now()) > 0
+
+
+def fail(job, error):
+    """Записывает неудачу, возвращает "retry", "failed" или "lost".
+
+    Неудача не записывается, если задачу уже забрал другой воркер.
+    """
+    job.attempts += 1
+    job.last_error = error
+    if job.attempts >= job.max_attempts:
+        job.status = Job.FAILED
+    else:
+        job.run_at = timezone.now() + timedelta(
+            seconds=retry_delay(job.attempts))
+    owned = Job.objects.filter(
+        pk=job.pk, claim_token=job.claim_token,
+    ).update(
+        attempts=job.attempts, last_error=job.last_error,
+        status=job.status, run_at=job.run_at,
+        claim_token=None, claimed_at=None)
+    if not owned:
+        return "lost"
+    job.claim_token = None
+    job.claimed_at = None
+    return "failed" if job.status == Job.FAILED else "retry"
+
+
+def run(job):
+    """Выполняет задачу, возвращает "done", "retry", "failed" или "lost".
+
+    Задача выполняется вне транзакции: рассылка пишет пачками и не
+    держит блокировку записи SQLite всё время работы. Поэтому задачи
+    должны быть идемпотентными: после падения воркера задача
+    выполнится снова. "lost" - задачу до запуска забрал другой воркер.
+    """
+    if not touch(job):
+        return "lost"
+    started = time.perf_counter()
+    try:
+        resolve(job.name)(**json.loads(job.payload))
+    except Exception:
+        result = fail(job, traceback.format_exc())
+    else:
+        Job.objects.filter(pk=job.pk).delete()
+        result = "done"
+    metrics.inc("yatube_jobs_total", task=job.name, result=result)
+    metrics.observe(
+        "yatube_job_duration_seconds", time.perf_counter() - started,
+        task=job.name)
+    return result
+
+
+def release(jobs):
+    """Возвращает в очередь захваченные, но не начатые задачи."""
+    Job.objects.filter(
+        pk__in=[job.pk for job in jobs],
+        claim_token__in={job.claim_token for job in jobs},
+    ).update(claim_token=None, claimed_at=None)
@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sqlite import pragma_statements
+
+SCHEMA = """
+CREATE TABLE post (
+    id INTEGER PRIMARY KEY,
+    author_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    pub_date REAL NOT NULL
+);
+CREATE INDEX post_author_pub_date_idx ON post (author_id, pub_date);
+"""
+READ = (
+    "SELECT id, text, pub_date FROM post WHERE author_id = ? "
+    "ORDER BY pub_date DESC LIMIT 10"
+)
+WRITE = "INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)"
+AUTHORS = 100
+STOCK_TIMEOUT = 5.0
+
+
+class Profile:
+    """Как рабочий процесс открывает соединения с базой."""
+
+    def __init__(self, path, pragmas, timeout, reuse):
+        self.path = path
+        self.pragmas = pragmas
+        self.timeout = timeout
+        self.reuse = reuse
+        self.local = threading.local()
+        self.connections = []
+
+    def connect(self):
+        # Закрываются соединения уже из основного потока.
+        connection = sqlite3.connect(
+            self.path, timeout=self.timeout, check_same_thread=False)
+        for statement in pragma_statements(self.pragmas):
+            connection.execute(statement)
+        return connection
+
+    def close(self):
+        for connection in self.connections:
+            connection.close()
+
+    def run(self, operation):
+        """Выполняет операцию как один запрос к сайту."""
+        if not self.reuse:
+            connection = self.connect()
+            try:
+                operation(connection)
+            finally:
+                connection.close()
+            return
+        if getattr(self.local, "connection", None) is None:
+            self.local.connection = self.connect()
+            self.connections.append(self.local.connection)
+        operation(self.local.connection)
+
+
+def read(connection, n):
+    connection.execute(READ, (n % AUTHORS,)).fetchall()
+
+
+def write(connection, n):
+    with connection:
+        connection.execute(WRITE, (n % AUTHORS, "text " * 50, time.time()))
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность SQLite при параллельных "
+        "чтениях и записях со стандартными настройками и с SQLITE_PRAGMAS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=3.0)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--rows", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        tuned_timeout = settings.DATABASES["default"].get(
+            "OPTIONS", {}).get("timeout", STOCK_TIMEOUT)
+        profiles = [
+            ("stock", {}, STOCK_TIMEOUT, False),
+            ("tuned", settings.SQLITE_PRAGMAS, tuned_timeout, True),
+        ]
+        for name, pragmas, timeout, reuse in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "bench.sqlite3")
+                self.prepare(path, options["rows"])
+                profile = Profile(path, pragmas, timeout, reuse)
+                reads, writes, errors = self.measure(profile, options)
+                profile.close()
+            seconds = options["seconds"]
+            self.stdout.write(
+                f"{name}: {reads / seconds:.0f} reads/s, "
+                f"{writes / seconds:.0f} writes/s, "
+                f"{errors} errors")
+
+    def prepare(self, path, rows):
+        connection = sqlite3.connect(path)
+        connection.executescript(SCHEMA)
+        with connection:
+            connection.executemany(WRITE, (
+                (n % AUTHORS, "text " * 50, n) for n in range(rows)))
+        connection.close()
+
+    def measure(self, profile, options):
+        deadline = time.monotonic() + options["seconds"]
+        done = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def worker(kind, operation):
+            count = errors = 0
+            while time.monotonic() < deadline:
+                try:
+                    profile.run(lambda c: operation(c, count))
+                    count += 1
+                except sqlite3.OperationalError:
+                    errors += 1
+            with lock:
+                done[kind] += count
+                done["errors"] += errors
+
+        threads = [
+            threading.Thread(target=worker, args=("reads", read))
+            for _ in range(options["readers"])
+        ] + [
+            threading.Thread(target=worker, args=("writes", write))
+            for _ in range(options["writers"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return done["reads"], done["writes"], done["errors"]
@@ -0,0 +1,110 @@
+import json
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment)
+
+from core import bench
+
+
+def sizes(value):
+    try:
+        return [int(size) for size in value.split(",")]
+    except ValueError:
+        raise CommandError(f"Неверный список размеров {value!r}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет p50/p95 задержки, число запросов и время отрисовки "
+        "шаблонов для всех адресов posts, users и about на тестовых "
+        "базах нескольких размеров. С --baseline падает на регрессиях."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=sizes, default=[100, 5000],
+            help="Размеры баз в постах через запятую.")
+        parser.add_argument("--repeat", type=int, default=30)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Файл для результатов JSON.")
+        parser.add_argument(
+            "--baseline", help="Сохранённые результаты для сравнения.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.5,
+            help="Допустимый относительный рост p95.")
+        parser.add_argument(
+            "--min-ms", type=float, default=5.0,
+            help="Рост p95 меньше этого числа мс не считается регрессией.")
+        parser.add_argument(
+            "--retries", type=int, default=2,
+            help="Сколько раз перемерить адреса с регрессией: "
+                 "остаётся лучший замер, случайные паузы не в счёт.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as source:
+                baseline = json.load(source)
+
+        results = self.run(options, baseline)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(results, output, ensure_ascii=False, indent=2)
+        if baseline is None:
+            return
+        regressions = self.regressions(results, baseline, options)
+        if regressions:
+            raise CommandError(
+                "Регрессии относительно базовой линии:\n" + "\n".join(
+                    f"{size} {view}: {change}"
+                    for size, view, change in regressions))
+        self.stdout.write(self.style.SUCCESS("Регрессий нет"))
+
+    def regressions(self, results, baseline, options):
+        return bench.compare(
+            results, baseline, options["threshold"], options["min_ms"])
+
+    def run(self, options, baseline):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = {}
+            for size in options["sizes"]:
+                call_command("flush", interactive=False, verbosity=0)
+                cache.clear()
+                user, kwargs = bench.seed_dataset(size, options["seed"])
+                views = bench.run_dataset(
+                    user, kwargs, options["repeat"], options["warmup"])
+                for _ in range(options["retries"] if baseline else 0):
+                    suspects = {view for _, view, _ in self.regressions(
+                        {str(size): views}, baseline, options)}
+                    if not suspects:
+                        break
+                    rerun = bench.run_dataset(
+                        user, kwargs, options["repeat"], options["warmup"],
+                        only=suspects)
+                    for view, result in rerun.items():
+                        if result["p95_ms"] < views[view]["p95_ms"]:
+                            views[view] = result
+                results[str(size)] = views
+                self.report(size, views)
+            return results
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def report(self, size, views):
+        self.stdout.write(f"Постов: {size}")
+        for view, result in views.items():
+            self.stdout.write(
+                f"  {view:45} {result['status']} "
+                f"p50 {result['p50_ms']:8.2f} мс  "
+                f"p95 {result['p95_ms']:8.2f} мс  "
+                f"шаблоны {result['render_ms']:7.2f} мс  "
+                f"запросов {result['queries']}")
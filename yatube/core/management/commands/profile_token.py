@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        "Выдаёт сотруднику токен для профилирования запросов: заголовок "
+        "X-Profile-Token или параметр ?profile=. Профили сохраняются "
+        "в PROFILING_DIR."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="username сотрудника.")
+
+    def handle(self, *args, **options):
+        username = options["username"]
+        if not get_user_model().objects.filter(
+                username=username, is_staff=True, is_active=True).exists():
+            raise CommandError(f"{username} не является сотрудником")
+        self.stdout.write(profiling.make_token(username))
+        self.stderr.write(
+            f"Токен действует {settings.PROFILING_TOKEN_MAX_AGE} с")
@@ -0,0 +1,85 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import jobs, metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет задачи фоновой очереди: забирает их пачками, "
+        "повторяет упавшие с растущей паузой и печатает пропускную "
+        "способность. Метрики попадают в METRICS_DIR."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.JOBS_BATCH_SIZE,
+            help="Сколько задач забирать за один запрос.")
+        parser.add_argument(
+            "--poll-interval", type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help="Пауза в секундах, когда очередь пуста.")
+        parser.add_argument(
+            "--report-every", type=float, default=60.0,
+            help="Как часто печатать пропускную способность, секунды.")
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Выйти, когда готовых задач не останется.")
+
+    def handle(self, *args, **options):
+        if settings.METRICS_ENABLED and not settings.METRICS_DIR:
+            self.stderr.write(
+                "METRICS_DIR не задан: метрики воркера не попадут "
+                "в /metrics сайта.")
+        self.started = time.monotonic()
+        self.reported = self.started
+        self.counts = {"done": 0, "retry": 0, "failed": 0, "lost": 0}
+        try:
+            self.loop(options)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            metrics.flush(force=True)
+            self.report()
+
+    def loop(self, options):
+        while True:
+            close_old_connections()
+            batch = jobs.claim(options["batch_size"])
+            if not batch:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+            self.run_batch(batch)
+            metrics.flush()
+            if time.monotonic() - self.reported >= options["report_every"]:
+                self.report()
+
+    def run_batch(self, batch):
+        for number, job in enumerate(batch):
+            try:
+                result = jobs.run(job)
+            except KeyboardInterrupt:
+                jobs.release(batch[number:])
+                raise
+            self.counts[result] += 1
+            if result in ("retry", "failed"):
+                self.stderr.write(
+                    f"{job}: попытка {job.attempts} из {job.max_attempts} "
+                    f"не удалась\n{job.last_error}")
+
+    def report(self):
+        now = time.monotonic()
+        self.reported = now
+        total = sum(self.counts.values())
+        rate = total / max(now - self.started, 1e-9)
+        self.stdout.write(
+            f"Задач: {total} (выполнено {self.counts['done']}, "
+            f"повтор {self.counts['retry']}, "
+            f"не выполнено {self.counts['failed']}, "
+            f"забрал другой воркер {self.counts['lost']}), "
+            f"{rate:.1f} задач/с")
@@ -0,0 +1,283 @@
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+# Границы корзин гистограмм в секундах, как у клиентов Prometheus.
+BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    "yatube_http_requests_total": (
+        "counter", "Запросы по адресу, методу и статусу ответа."),
+    "yatube_http_request_duration_seconds": (
+        "histogram", "Время ответа представления."),
+    "yatube_db_queries_total": (
+        "counter", "SQL-запросы, выполненные при ответе."),
+    "yatube_db_query_duration_seconds_total": (
+        "counter", "Суммарное время SQL-запросов."),
+    "yatube_template_render_duration_seconds": (
+        "histogram", "Время отрисовки шаблонов за запрос."),
+    "yatube_page_cache_requests_total": (
+        "counter", "Обращения к кешу страниц: hit или miss."),
+    "yatube_slow_queries_total": (
+        "counter", "SQL-запросы дольше QUERYLOG_SLOW_MS."),
+    "yatube_repeated_queries_total": (
+        "counter", "Повторы одной формы SQL за запрос (N+1)."),
+    "yatube_jobs_total": (
+        "counter", "Задачи очереди по результату: done, retry, failed, lost."),
+    "yatube_job_duration_seconds": (
+        "histogram", "Время выполнения задачи очереди."),
+}
+
+# Замеры текущего запроса; вне запроса - None.
+_current = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("queries", "query_time", "render_time", "render_depth")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.render_time = 0.0
+        self.render_depth = 0
+
+
+class Registry:
+    """Счётчики и гистограммы одного процесса.
+
+    Ключ значения - имя метрики и кортеж пар меток.
+    Запись идёт под блокировкой, поэтому потоки одного воркера
+    не теряют приращений.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [
+                    [0] * (len(BUCKETS) + 1), 0.0]
+            histogram[0][bisect_left(BUCKETS, value)] += 1
+            histogram[1] += value
+
+    def snapshot(self):
+        """Значения в виде, пригодном для JSON."""
+        with self.lock:
+            return {
+                "counters": [
+                    [name, labels, value]
+                    for (name, labels), value in self.counters.items()],
+                "histograms": [
+                    [name, labels, list(counts), total]
+                    for (name, labels), (counts, total)
+                    in self.histograms.items()],
+            }
+
+    def clear(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+registry = Registry()
+# Сохранение в METRICS_DIR: проверка интервала и запись файла идут
+# под одной блокировкой, чтобы потоки не писали файл одновременно.
+_flush_lock = threading.Lock()
+_last_flush = [0.0]
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, **labels)
+
+
+def time_query(execute, sql, params, many, context):
+    """Обёртка execute_wrapper: число и время запросов текущего запроса."""
+    stats = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            stats.queries += 1
+            stats.query_time += time.perf_counter() - started
+
+
+@contextmanager
+def collect():
+    """Собирает RequestStats для кода внутри блока."""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(time_query))
+            yield stats
+    finally:
+        _current.reset(token)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # Вложенные отрисовки, например виджеты форм, уже входят
+        # во время внешней.
+        stats.render_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.render_depth -= 1
+            if not stats.render_depth:
+                stats.render_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Шаблонизатор Django, замеряющий время отрисовки для метрик."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def record_request(view, method, status, duration, stats):
+    inc("yatube_http_requests_total", view=view, method=method,
+        status=str(status))
+    observe("yatube_http_request_duration_seconds", duration, view=view)
+    inc("yatube_db_queries_total", stats.queries, view=view)
+    inc("yatube_db_query_duration_seconds_total", stats.query_time,
+        view=view)
+    if stats.render_time:
+        observe("yatube_template_render_duration_seconds",
+                stats.render_time, view=view)
+
+
+def flush(force=False):
+    """Сохраняет значения процесса в METRICS_DIR.
+
+    Каждый воркер пишет свой файл не чаще METRICS_FLUSH_SECONDS,
+    а `/metrics` складывает файлы всех воркеров. Запрос не ждёт,
+    пока значения сохраняет другой поток, а force ждёт.
+    """
+    directory = settings.METRICS_DIR
+    if not directory or not _flush_lock.acquire(blocking=force):
+        return
+    try:
+        now = time.monotonic()
+        interval = settings.METRICS_FLUSH_SECONDS
+        if not force and now - _last_flush[0] < interval:
+            return
+        _last_flush[0] = now
+        write_snapshot(directory)
+    finally:
+        _flush_lock.release()
+
+
+def write_snapshot(directory):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as snapshot_file:
+            json.dump(registry.snapshot(), snapshot_file)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def snapshots():
+    if not settings.METRICS_DIR:
+        return [registry.snapshot()]
+    flush(force=True)
+    loaded = []
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, "*.json")):
+        with open(path, encoding="utf-8") as snapshot_file:
+            loaded.append(json.load(snapshot_file))
+    return loaded
+
+
+def merge(loaded):
+    counters, histograms = {}, {}
+    for snapshot in loaded:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, counts, total in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [[0] * len(counts), 0.0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+    return counters, histograms
+
+
+def escape(value):
+    return (
+        str(value).replace("\\", "\\\\")
+        .replace("\n", "\\n").replace('"', '\\"'))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def histogram_lines(name, labels, counts, total):
+    cumulative = 0
+    for bound, count in zip(BUCKETS + ("+Inf",), counts):
+        cumulative += count
+        bucket_labels = labels + (("le", str(bound)),)
+        yield f"{name}_bucket{format_labels(bucket_labels)} {cumulative}"
+    yield f"{name}_sum{format_labels(labels)} {total}"
+    yield f"{name}_count{format_labels(labels)} {cumulative}"
+
+
+def render_text(loaded):
+    """Значения в текстовом формате Prometheus."""
+    counters, histograms = merge(loaded)
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (key_name, labels), value in sorted(counters.items()):
+                if key_name == name:
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+        else:
+            for (key_name, labels), (counts, total) in sorted(
+                    histograms.items()):
+                if key_name == name:
+                    lines.extend(
+                        histogram_lines(name, labels, counts, total))
+    return "\n".join(lines) + "\n"
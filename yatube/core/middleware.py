@@ -0,0 +1,110 @@
+import time
+
+from django.conf import settings
+
+from . import metrics, profiling, querylog
+from .db_router import allow_replica_reads, has_written, restore
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет пользователя за primary на время после его записи.
+
+    Запросы с небезопасными методами и всё, что пришло в течение
+    DATABASE_PIN_SECONDS после записи данных, читают с primary: так
+    после `post_create` редирект на профиль уже показывает новый пост.
+    Вход, выход и обновление сессии пользователя не закрепляют.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = (
+            request.method not in SAFE_METHODS
+            or settings.DATABASE_PIN_COOKIE in request.COOKIES)
+        tokens = allow_replica_reads(not pinned)
+        try:
+            response = self.get_response(request)
+            if has_written():
+                response.set_cookie(
+                    settings.DATABASE_PIN_COOKIE, "1",
+                    max_age=settings.DATABASE_PIN_SECONDS,
+                    httponly=True,
+                    samesite="Lax",
+                )
+        finally:
+            restore(tokens)
+        return response
+
+
+class MetricsMiddleware:
+    """Собирает метрики запроса для `/metrics`.
+
+    Стоит первым в MIDDLEWARE, чтобы время ответа включало остальные
+    обработчики. Потоковые ответы учитываются до начала отдачи тела.
+    Адрес в метке - имя из URLconf, чтобы число рядов было конечным.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with metrics.collect() as stats:
+            response = self.get_response(request)
+        match = request.resolver_match
+        metrics.record_request(
+            match.view_name if match else "unresolved",
+            request.method, response.status_code,
+            time.perf_counter() - started, stats)
+        metrics.flush()
+        return response
+
+
+class QueryLogMiddleware:
+    """Журнал медленных SQL-запросов и повторов одной формы (N+1).
+
+    Следит только за долей QUERYLOG_SAMPLE_RATE запросов,
+    чтобы оставаться включённым под нагрузкой.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not querylog.sampled():
+            return self.get_response(request)
+        with querylog.watch_queries(request):
+            return self.get_response(request)
+
+
+class ProfilingMiddleware:
+    """Снимает профиль запроса по токену сотрудника или случайно.
+
+    Токен выдаёт команда `profile_token` и принимается в заголовке
+    X-Profile-Token или в параметре ?profile=. Такой ответ получает
+    заголовок X-Profile с именем сохранённых файлов. Кроме того,
+    профилируется случайный запрос из PROFILING_SAMPLE_EVERY.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = profiling.requested(request)
+        if not requested and not profiling.sampled():
+            return self.get_response(request)
+        with profiling.exclusive() as acquired:
+            if not acquired:
+                return self.get_response(request)
+            with profiling.RequestProfile() as profile:
+                response = self.get_response(request)
+            match = request.resolver_match
+            name = profile.save(match.view_name if match else "unresolved")
+        if requested:
+            response["X-Profile"] = name
+        return response
@@ -0,0 +1,49 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """Задача фоновой очереди, см. `core.jobs`.
+
+    Выполненные задачи удаляются, в таблице остаются ждущие
+    и исчерпавшие попытки.
+    """
+
+    QUEUED = "queued"
+    FAILED = "failed"
+    STATUSES = [
+        (QUEUED, "В очереди"),
+        (FAILED, "Не выполнена"),
+    ]
+
+    name = models.CharField(verbose_name="Функция", max_length=200)
+    payload = models.TextField(verbose_name="Аргументы JSON", default="{}")
+    priority = models.SmallIntegerField(
+        verbose_name="Приоритет", default=0)
+    status = models.CharField(
+        verbose_name="Состояние", max_length=10,
+        choices=STATUSES, default=QUEUED)
+    run_at = models.DateTimeField(verbose_name="Выполнить не раньше")
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name="Попыток", default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name="Наибольшее число попыток")
+    claim_token = models.CharField(
+        verbose_name="Токен захвата", max_length=32, blank=True, null=True)
+    claimed_at = models.DateTimeField(
+        verbose_name="Захвачена", blank=True, null=True)
+    last_error = models.TextField(verbose_name="Последняя ошибка", blank=True)
+    created = models.DateTimeField(
+        verbose_name="Поставлена", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+        indexes = [
+            models.Index(
+                fields=["status", "priority", "run_at"],
+                name="job_queue_idx"),
+            models.Index(fields=["claim_token"], name="job_claim_token_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
@@ -0,0 +1,153 @@
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+
+HEADER = "HTTP_X_PROFILE_TOKEN"
+QUERY_PARAMETER = "profile"
+SALT = "core.profiling"
+UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+# Одновременно профилируется один запрос процесса: профили не мешают
+# друг другу, а всплеск подписанных запросов не замедлит воркер.
+_lock = threading.Lock()
+
+
+def make_token(username):
+    """Подписанный токен сотрудника для заголовка или параметра запроса."""
+    return signing.TimestampSigner(salt=SALT).sign(username)
+
+
+def token_user(token):
+    """Сотрудник, выдавший действующий токен, или None."""
+    try:
+        username = signing.TimestampSigner(salt=SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return get_user_model().objects.filter(
+        username=username, is_staff=True, is_active=True).first()
+
+
+def requested(request):
+    """Просит ли запрос профиль действующим токеном сотрудника."""
+    token = request.META.get(HEADER) or request.GET.get(QUERY_PARAMETER)
+    return bool(token) and token_user(token) is not None
+
+
+def sampled():
+    """Случайный запрос из каждых PROFILING_SAMPLE_EVERY; 0 - никогда."""
+    every = settings.PROFILING_SAMPLE_EVERY
+    return every > 0 and random.randrange(every) == 0
+
+
+def frame_name(frame):
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Раз в PROFILING_INTERVAL_MS снимает стек потока запроса.
+
+    Счётчик стеков пишется в формате collapsed для flamegraph.pl
+    и speedscope: функции от внешней к внутренней через «;».
+    """
+
+    def __init__(self, thread_id):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = settings.PROFILING_INTERVAL_MS / 1000
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def base_name(view_name):
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    view = UNSAFE_NAME.sub("_", view_name)
+    return f"{stamp}-{view}-{os.getpid()}-{threading.get_ident()}"
+
+
+def prune(directory, max_bytes):
+    """Удаляет самые старые профили, пока каталог больше max_bytes."""
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+class RequestProfile:
+    """cProfile и снимки стека для кода внутри блока with."""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident())
+
+    def __enter__(self):
+        self.sampler.start()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.disable()
+        self.sampler.stop()
+
+    def save(self, view_name):
+        """Сохраняет .prof и .collapsed в PROFILING_DIR, возвращает имя."""
+        directory = settings.PROFILING_DIR
+        os.makedirs(directory, exist_ok=True)
+        name = base_name(view_name)
+        self.profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+        collapsed_path = os.path.join(directory, f"{name}.collapsed")
+        with open(collapsed_path, "w", encoding="utf-8") as collapsed_file:
+            collapsed_file.write(self.sampler.collapsed())
+        prune(directory, settings.PROFILING_MAX_BYTES)
+        return name
+
+
+@contextmanager
+def exclusive():
+    """Истина, если другой запрос процесса сейчас не профилируется."""
+    acquired = _lock.acquire(blocking=False)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _lock.release()
@@ -0,0 +1,182 @@
+import logging
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.template.base import Node
+
+from . import metrics
+
+logger = logging.getLogger("yatube.queries")
+
+# Каталог установленных пакетов: их строки в источник запроса не идут.
+PACKAGES_ROOT = os.path.dirname(os.path.dirname(django.__file__))
+
+
+def template_origins(frame):
+    """Строки шаблонов, из которых выполняется код, от внутренней к внешней.
+
+    Каждый узел шаблона отрисовывается своим методом render,
+    так что по стеку видно, какой тег или переменная вызвали запрос.
+    """
+    origins = []
+    while frame is not None:
+        node = frame.f_locals.get("self")
+        # type(), а не isinstance(): ленивый объект вроде request.user
+        # вычислился бы при проверке __class__ и выполнил бы запрос.
+        if (issubclass(type(node), Node) and frame.f_code.co_name == "render"
+                and node.origin is not None):
+            name = node.origin.template_name or node.origin.name
+            origin = f"{name}:{node.token.lineno}"
+            if not origins or origins[-1] != origin:
+                origins.append(origin)
+        frame = frame.f_back
+    return origins
+
+
+def code_origin(frame):
+    """Первая строка кода проекта в стеке, без Django и библиотек."""
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(settings.BASE_DIR)
+                and not filename.startswith(PACKAGES_ROOT)):
+            relative = os.path.relpath(filename, settings.BASE_DIR)
+            return f"{relative}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    """Обёртка execute_wrapper, запоминающая запросы и их источник."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        frame = sys._getframe(1)
+        self.queries.append({
+            "sql": sql,
+            "code": code_origin(frame),
+            "templates": template_origins(frame),
+        })
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def report(self):
+        """Запросы по одному в строке, с местом в коде и стеком шаблонов."""
+        lines = []
+        for number, query in enumerate(self.queries, 1):
+            lines.append(f"{number}. {query['sql']}")
+            if query["code"]:
+                lines.append(f"   код: {query['code']}")
+            if query["templates"]:
+                lines.append(
+                    "   шаблоны: " + " <- ".join(query["templates"]))
+        return "\n".join(lines)
+
+
+@contextmanager
+def record_queries(using="default"):
+    recorder = QueryRecorder()
+    with connections[using].execute_wrapper(recorder):
+        yield recorder
+
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST = re.compile(r"\bIN \((?:[^()]*)\)", re.IGNORECASE)
+SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Форма запроса: без значений, списков IN и лишних пробелов.
+
+    Запросы, которые отличаются только параметрами, получают одну форму.
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql)
+    sql = IN_LIST.sub("IN (...)", sql)
+    return SPACES.sub(" ", sql).strip()
+
+
+def call_site(frame):
+    """Место в коде и стек шаблонов одной строкой для журнала."""
+    site = code_origin(frame) or "?"
+    templates = template_origins(frame)
+    if templates:
+        site += " шаблоны: " + " <- ".join(templates)
+    return site
+
+
+class QueryWatcher:
+    """Обёртка execute_wrapper для журнала медленных запросов и N+1.
+
+    Стек разбирается только для медленного запроса и для формы,
+    повторившейся QUERYLOG_REPEAT_THRESHOLD раз, поэтому обычные
+    запросы обходятся замером времени и подсчётом формы.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.slow_seconds = settings.QUERYLOG_SLOW_MS / 1000
+        self.repeat_threshold = settings.QUERYLOG_REPEAT_THRESHOLD
+        self.shapes = Counter()
+        self.repeat_sites = {}
+
+    @property
+    def view_name(self):
+        match = self.request.resolver_match
+        return match.view_name if match else "unresolved"
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            shape = normalize_sql(sql)
+            self.shapes[shape] += 1
+            if self.shapes[shape] == self.repeat_threshold:
+                self.repeat_sites[shape] = call_site(sys._getframe(1))
+            if duration >= self.slow_seconds:
+                self.log_slow(shape, duration, sys._getframe(1))
+
+    def log_slow(self, shape, duration, frame):
+        metrics.inc("yatube_slow_queries_total", view=self.view_name)
+        logger.warning(
+            "Медленный запрос %.1f мс в %s: %s; вызван из %s",
+            duration * 1000, self.view_name, shape, call_site(frame))
+
+    def report_repeats(self):
+        """Пишет в журнал формы, повторившиеся за запрос, - признак N+1."""
+        for shape, site in self.repeat_sites.items():
+            metrics.inc("yatube_repeated_queries_total", view=self.view_name)
+            logger.warning(
+                "Возможный N+1 в %s: %d одинаковых запросов %s; вызван из %s",
+                self.view_name, self.shapes[shape], shape, site)
+
+
+@contextmanager
+def watch_queries(request):
+    """Следит за запросами всех баз внутри блока."""
+    watcher = QueryWatcher(request)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(watcher))
+        yield watcher
+    watcher.report_repeats()
+
+
+def sampled():
+    """Попадает ли запрос в выборку с долей QUERYLOG_SAMPLE_RATE."""
+    rate = settings.QUERYLOG_SAMPLE_RATE
+    return rate >= 1 or random.random() < rate
@@ -0,0 +1,29 @@
+from django.contrib.sessions.backends import cached_db
+
+
+class SessionStore(cached_db.SessionStore):
+    """Сессии в кеше с записью в базу только при изменении данных.
+
+    Как и cached_db, сессия читается из кеша, а сохраняется в базу
+    и в кеш. Если данные после загрузки не изменились, хотя сессию
+    пометили изменённой, запись пропускается.
+    """
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded = None
+
+    def snapshot(self, data):
+        return self.session_key, self.serializer().dumps(data)
+
+    def load(self):
+        data = super().load()
+        self._loaded = self.snapshot(data)
+        return data
+
+    def save(self, must_create=False):
+        if (not must_create and self._loaded is not None
+                and self.snapshot(self._get_session()) == self._loaded):
+            return
+        super().save(must_create)
+        self._loaded = self.snapshot(self._session)
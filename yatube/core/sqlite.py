@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def pragma_statements(pragmas):
+    return [f"PRAGMA {name} = {value}" for name, value in pragmas.items()]
+
+
+def tune_connection(sender, connection, **kwargs):
+    """Выполняет SQLITE_PRAGMAS на каждом новом соединении с SQLite."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(settings.SQLITE_PRAGMAS):
+            cursor.execute(statement)
@@ -0,0 +1,19 @@
+from django import template
+from django.conf import settings
+from django.urls import reverse
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def fragment(url_name, *args):
+    """Место персональной части на странице, общей для всех посетителей.
+
+    В режиме "esi" часть подставляет прокси, в режиме "js" -
+    static/js/fragments.js после загрузки страницы.
+    """
+    url = reverse(url_name, args=args)
+    if settings.FRAGMENTS_MODE == "esi":
+        return format_html('<esi:include src="{}"/>', url)
+    return format_html('<template data-fragment="{}"></template>', url)
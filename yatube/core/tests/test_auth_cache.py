@@ -0,0 +1,124 @@
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import User
+
+from ..auth import CachedModelBackend, user_key
+from ..checks import check_shared_cache
+from ..sessions import SessionStore
+
+CACHED_AUTH = override_settings(
+    SESSION_ENGINE="core.sessions",
+    AUTHENTICATION_BACKENDS=[
+        "core.auth.CachedModelBackend",
+        "django.contrib.auth.backends.ModelBackend",
+    ],
+)
+MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+
+
+class SessionStoreTests(TestCase):
+    def test_unchanged_session_is_not_written(self):
+        session = SessionStore()
+        session["answer"] = [42]
+        session.save()
+        loaded = SessionStore(session.session_key)
+
+        loaded["answer"] = [42]
+        with self.assertNumQueries(0):
+            loaded.save()
+        loaded["answer"].append(43)
+        loaded.modified = True
+        loaded.save()
+
+        stored = Session.objects.get(session_key=session.session_key)
+        self.assertEqual(stored.get_decoded(), {"answer": [42, 43]})
+
+
+@CACHED_AUTH
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user", password="old-password-1")
+        self.client.login(username="user", password="old-password-1")
+        self.other_client = Client()
+        self.other_client.login(username="user", password="old-password-1")
+
+    def test_request_user_comes_from_cache(self):
+        path = reverse("posts:nav_fragment")
+        self.client.get(path)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(path)
+
+        self.assertContains(response, "Пользователь: user")
+
+    def test_saved_user_is_written_through(self):
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(CachedModelBackend().get_user(self.user.pk))
+
+    def test_password_change_logs_out_other_sessions(self):
+        response = self.client.post(reverse("users:password_change"), {
+            "old_password": "old-password-1",
+            "new_password1": "new-password-2",
+            "new_password2": "new-password-2",
+        })
+
+        self.assertRedirects(response, reverse("users:password_change_done"))
+        nav = reverse("posts:nav_fragment")
+        self.assertContains(self.client.get(nav), "Пользователь: user")
+        self.assertContains(self.other_client.get(nav), "Войти")
+        self.assertTrue(CachedModelBackend().get_user(
+            self.user.pk).check_password("new-password-2"))
+
+    def test_logout_forgets_session(self):
+        self.client.get(reverse("users:logout"))
+
+        self.assertContains(
+            self.client.get(reverse("posts:nav_fragment")), "Войти")
+        self.assertContains(
+            self.other_client.get(reverse("posts:nav_fragment")),
+            "Пользователь: user")
+
+    def test_permission_caches_are_not_cached(self):
+        self.user.has_perm("posts.add_post")
+        self.user.save()
+
+        cached = cache.get(user_key(self.user.pk))
+        self.assertNotIn("_perm_cache", vars(cached))
+        self.assertIn("_perm_cache", vars(self.user))
+
+    def test_session_opened_with_model_backend_stays_valid(self):
+        client = Client()
+        client.force_login(self.user, backend=MODEL_BACKEND)
+
+        response = client.get(reverse("posts:nav_fragment"))
+
+        self.assertEqual(client.session[BACKEND_SESSION_KEY], MODEL_BACKEND)
+        self.assertContains(response, "Пользователь: user")
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @CACHED_AUTH
+    def test_cached_auth_needs_shared_cache(self):
+        errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["core.E001"])
+
+    @CACHED_AUTH
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.db",
+        AUTHENTICATION_BACKENDS=[MODEL_BACKEND])
+    def test_database_sessions_pass(self):
+        self.assertEqual(check_shared_cache(None), [])
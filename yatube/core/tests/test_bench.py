@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from core import bench
+
+
+class BenchTests(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 21))
+
+        self.assertEqual(bench.percentile(values, 0.5), 10)
+        self.assertEqual(bench.percentile(values, 0.95), 19)
+        self.assertEqual(bench.percentile([7], 0.95), 7)
+
+    def test_url_patterns_cover_apps(self):
+        names = dict(bench.url_patterns())
+
+        self.assertEqual(names["posts:group_list"], ["slug"])
+        self.assertIn("users:login", names)
+        self.assertIn("about:tech", names)
+        self.assertNotIn("admin:index", names)
+
+    def test_compare_reports_regressions(self):
+        baseline = {"100": {
+            "posts:index guest": {"p95_ms": 10.0, "queries": 3},
+            "posts:index user": {"p95_ms": 10.0, "queries": 3},
+        }}
+        results = {"100": {
+            "posts:index guest": {"p95_ms": 20.0, "queries": 3},
+            "posts:index user": {"p95_ms": 10.5, "queries": 4},
+            "posts:search guest": {"p95_ms": 99.0, "queries": 9},
+        }}
+
+        regressions = bench.compare(results, baseline, 0.25, 1.0)
+
+        self.assertEqual(
+            [(size, view) for size, view, _ in regressions],
+            [("100", "posts:index guest"), ("100", "posts:index user")])
+        self.assertEqual(bench.compare(results, baseline, 1.5, 1.0), [
+            ("100", "posts:index user", "запросов 3 -> 4")])
+
+    def test_run_dataset_measures_views(self):
+        cache.clear()
+        user, kwargs = bench.seed_dataset(60)
+
+        results = bench.run_dataset(
+            user, kwargs, repeat=3, warmup=1,
+            only={"posts:follow_index user", "posts:group_list guest"})
+
+        self.assertEqual(
+            set(results),
+            {"posts:follow_index user", "posts:group_list guest"})
+        follow = results["posts:follow_index user"]
+        self.assertEqual(follow["status"], 200)
+        self.assertGreater(follow["queries"], 0)
+        self.assertGreater(follow["render_ms"], 0)
+        self.assertLessEqual(follow["p50_ms"], follow["p95_ms"])
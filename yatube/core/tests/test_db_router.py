@@ -0,0 +1,122 @@
+import os
+import sqlite3
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory, TestCase, TransactionTestCase, override_settings)
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..db_router import PRIMARY, ReplicaRouter, allow_replica_reads, restore
+from ..middleware import ReplicaPinMiddleware
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.read_from = []
+
+    def get_response(self, request):
+        self.read_from.append(self.router.db_for_read(User))
+        if request.method == "POST":
+            self.router.db_for_write(User)
+        if request.path == "/auth/login/":
+            self.router.db_for_write(Session)
+        return HttpResponse()
+
+    def test_reads_outside_requests_go_to_primary(self):
+        self.assertEqual(self.router.db_for_read(User), PRIMARY)
+
+    def test_reads_go_to_replica_until_first_write(self):
+        tokens = allow_replica_reads(True)
+        try:
+            self.assertEqual(self.router.db_for_read(User), "replica")
+            self.assertEqual(self.router.db_for_write(User), PRIMARY)
+            self.assertEqual(self.router.db_for_read(User), PRIMARY)
+        finally:
+            restore(tokens)
+
+    def test_write_pins_following_requests_to_primary(self):
+        middleware = ReplicaPinMiddleware(self.get_response)
+
+        response = middleware(self.factory.post("/create/"))
+        cookie = response.cookies["db_pin"]
+        middleware(self.factory.get("/profile/user/"))
+        pinned_request = self.factory.get("/profile/user/")
+        pinned_request.COOKIES["db_pin"] = cookie.value
+        middleware(pinned_request)
+
+        self.assertEqual(self.read_from, [PRIMARY, "replica", PRIMARY])
+
+    def test_session_write_does_not_pin(self):
+        middleware = ReplicaPinMiddleware(self.get_response)
+
+        response = middleware(self.factory.get("/auth/login/"))
+
+        self.assertNotIn("db_pin", response.cookies)
+        self.assertEqual(self.router.db_for_read(Session), PRIMARY)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class SqliteReplicaTests(TransactionTestCase):
+    """Реплика - отдельный файл SQLite, снятый с primary и отстающий от него.
+
+    Пост, записанный после снимка, есть только на primary: по нему
+    видно, с какой базы прочитан ответ.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username="author", password="secret-pass-1")
+        Post.objects.create(author=self.author, text="на реплике")
+        handle, self.replica_path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        primary = connections[PRIMARY]
+        primary.ensure_connection()
+        replica = sqlite3.connect(self.replica_path)
+        primary.connection.backup(replica)
+        replica.close()
+        connections.databases["replica"] = {
+            **connections.databases[PRIMARY],
+            "NAME": self.replica_path,
+            "TEST": {"NAME": self.replica_path},
+        }
+        self.primary_post = Post.objects.create(
+            author=self.author, text="только на primary")
+
+    def tearDown(self):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.databases["replica"]
+        os.remove(self.replica_path)
+
+    def primary_post_status(self):
+        return self.client.get(reverse(
+            "posts:api_post_detail",
+            kwargs={"post_id": self.primary_post.id})).status_code
+
+    def test_reads_use_replica_until_write_pins_primary(self):
+        self.assertEqual(self.primary_post_status(), 404)
+
+        response = self.client.post(reverse("users:login"), {
+            "username": "author", "password": "secret-pass-1"})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn("db_pin", response.cookies)
+        self.assertEqual(self.primary_post_status(), 404)
+
+        response = self.client.post(
+            reverse("posts:post_create"), {"text": "новый"})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("db_pin", response.cookies)
+        self.assertEqual(self.primary_post_status(), 200)
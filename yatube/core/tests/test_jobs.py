@@ -0,0 +1,185 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import FeedItem, Follow, Post, User
+
+from .. import jobs
+from ..models import Job
+
+calls = []
+
+
+@jobs.task
+def record(value):
+    calls.append(value)
+
+
+@jobs.task
+def record_depth():
+    calls.append(len(connection.savepoint_ids))
+
+
+@jobs.task
+def explode():
+    raise ValueError("сломалось")
+
+
+def not_a_task():
+    pass
+
+
+@override_settings(JOBS_RETRY_DELAY=10, JOBS_MAX_ATTEMPTS=3)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_only_tasks_are_enqueued(self):
+        with self.assertRaises(jobs.UnknownTask):
+            jobs.enqueue(not_a_task)
+        job = Job.objects.create(
+            name="os.remove", run_at=timezone.now(), max_attempts=1)
+
+        self.assertEqual(jobs.run(job), "failed")
+        self.assertIn("UnknownTask", Job.objects.get().last_error)
+
+    def test_claim_order_and_tokens(self):
+        low = jobs.enqueue(record, value="low")
+        high = jobs.enqueue(record, priority=jobs.HIGH, value="high")
+        jobs.enqueue(record, delay=60, value="later")
+
+        first = jobs.claim(1)
+        second = jobs.claim(10)
+
+        self.assertEqual([job.pk for job in first], [high.pk])
+        self.assertEqual([job.pk for job in second], [low.pk])
+        self.assertNotEqual(first[0].claim_token, second[0].claim_token)
+        self.assertEqual(jobs.claim(10), [])
+
+    def test_stale_claims_are_reclaimed(self):
+        job = jobs.enqueue(record, value=1)
+        jobs.claim(1)
+        Job.objects.filter(pk=job.pk).update(
+            claimed_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual([job.pk for job in jobs.claim(1)], [job.pk])
+
+    def test_success_deletes_job(self):
+        jobs.enqueue(record, value={"a": 1})
+
+        job, = jobs.claim(1)
+
+        self.assertEqual(jobs.run(job), "done")
+        self.assertEqual(calls, [{"a": 1}])
+        self.assertFalse(Job.objects.exists())
+
+    def test_task_runs_outside_transaction(self):
+        jobs.enqueue(record_depth)
+        job, = jobs.claim(1)
+
+        jobs.run(job)
+
+        self.assertEqual(calls, [len(connection.savepoint_ids)])
+
+    def test_reclaimed_job_runs_once(self):
+        jobs.enqueue(record, value=1)
+        stale, = jobs.claim(1)
+        Job.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        reclaimed, = jobs.claim(1)
+
+        self.assertEqual(jobs.run(stale), "lost")
+        self.assertEqual(jobs.run(reclaimed), "done")
+        self.assertEqual(calls, [1])
+
+    def test_run_refreshes_claim(self):
+        jobs.enqueue(record, value=1)
+        job, = jobs.claim(1)
+        old = timezone.now() - timedelta(hours=1)
+        Job.objects.update(claimed_at=old)
+
+        self.assertTrue(jobs.touch(job))
+        self.assertGreater(Job.objects.get().claimed_at, old)
+
+    def test_failure_of_lost_claim_is_not_recorded(self):
+        jobs.enqueue(explode)
+        stale, = jobs.claim(1)
+        Job.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        reclaimed, = jobs.claim(1)
+
+        self.assertEqual(jobs.fail(stale, "ошибка"), "lost")
+        job = Job.objects.get()
+        self.assertEqual(job.attempts, 0)
+        self.assertEqual(job.claim_token, reclaimed.claim_token)
+
+    def test_failures_back_off_then_fail(self):
+        jobs.enqueue(explode)
+        delays = []
+        for expected in ("retry", "retry", "failed"):
+            job = Job.objects.get()
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            job, = jobs.claim(1)
+            started = timezone.now()
+
+            self.assertEqual(jobs.run(job), expected)
+            job.refresh_from_db()
+            delays.append(round((job.run_at - started).total_seconds()))
+
+        self.assertEqual(delays[:2], [10, 20])
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertIn("сломалось", job.last_error)
+        self.assertEqual(jobs.claim(1), [])
+
+    def test_run_worker_once(self):
+        for value in range(5):
+            jobs.enqueue(record, value=value)
+        jobs.enqueue(explode)
+        stdout = StringIO()
+
+        call_command(
+            "run_worker", "--once", "--batch-size", "2",
+            stdout=stdout, stderr=StringIO())
+
+        self.assertEqual(calls, [0, 1, 2, 3, 4])
+        self.assertIn("Задач: 6 (выполнено 5, повтор 1", stdout.getvalue())
+        self.assertEqual(Job.objects.get().attempts, 1)
+
+
+class JobHooksTests(TestCase):
+    def test_new_post_is_delivered_by_worker(self):
+        author = User.objects.create_user(username="author")
+        reader = User.objects.create_user(username="reader")
+        Follow.objects.create(user=reader, author=author)
+
+        post = Post.objects.create(text="Текст", author=author)
+
+        self.assertFalse(FeedItem.objects.filter(post=post).exists())
+        self.assertEqual(Job.objects.get().name, "posts.follow.deliver")
+        call_command(
+            "run_worker", "--once", stdout=StringIO(), stderr=StringIO())
+        self.assertTrue(
+            FeedItem.objects.filter(user=reader, post=post).exists())
+
+    def test_password_reset_email_is_queued(self):
+        User.objects.create_user(
+            username="user", email="user@example.com", password="secret-1")
+
+        response = self.client.post(
+            reverse("users:password_reset"), {"email": "user@example.com"})
+
+        self.assertRedirects(response, reverse("users:password_reset_done"))
+        self.assertEqual(mail.outbox, [])
+        job = Job.objects.get()
+        self.assertEqual(job.priority, jobs.HIGH)
+        self.assertNotIn("/auth/reset/", job.payload)
+        call_command(
+            "run_worker", "--once", stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@example.com"])
+        self.assertIn("/auth/reset/", mail.outbox[0].body)
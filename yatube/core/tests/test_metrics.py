@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from .. import metrics
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.registry.clear()
+        author = User.objects.create_user(username="author")
+        Post.objects.create(text="Текст", author=author)
+
+    def counter(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        return metrics.registry.counters.get(key)
+
+    def test_request_is_recorded(self):
+        self.client.get(reverse("posts:index"))
+        self.client.get(reverse("posts:index"))
+
+        self.assertEqual(self.counter(
+            "yatube_http_requests_total",
+            view="posts:index", method="GET", status="200"), 2)
+        self.assertGreater(self.counter(
+            "yatube_db_queries_total", view="posts:index"), 0)
+        self.assertEqual(self.counter(
+            "yatube_page_cache_requests_total",
+            view="posts:index", result="miss"), 1)
+        self.assertEqual(self.counter(
+            "yatube_page_cache_requests_total",
+            view="posts:index", result="hit"), 1)
+        histogram_key = (
+            "yatube_template_render_duration_seconds",
+            (("view", "posts:index"),))
+        counts, total = metrics.registry.histograms[histogram_key]
+        # Страница из кеша шаблоны не отрисовывает.
+        self.assertEqual(sum(counts), 1)
+        self.assertGreater(total, 0)
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("posts:index"))
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn("# TYPE yatube_http_request_duration_seconds "
+                      "histogram", text)
+        self.assertIn('yatube_http_requests_total{method="GET",'
+                      'status="200",view="posts:index"} 1', text)
+        self.assertIn('yatube_http_request_duration_seconds_bucket{'
+                      'view="posts:index",le="+Inf"} 1', text)
+        self.assertIn('yatube_http_request_duration_seconds_count{'
+                      'view="posts:index"} 1', text)
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.0.0.1"])
+    def test_metrics_endpoint_is_private(self):
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_workers_are_merged(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_DIR=directory):
+            other = metrics.Registry()
+            other.inc("yatube_db_queries_total", 3, view="posts:index")
+            other.observe("yatube_http_request_duration_seconds", 0.02,
+                          view="posts:index")
+            metrics.registry.inc(
+                "yatube_db_queries_total", 2, view="posts:index")
+            metrics.registry.observe(
+                "yatube_http_request_duration_seconds", 7.0,
+                view="posts:index")
+            with open(f"{directory}/1.json", "w") as snapshot_file:
+                snapshot_file.write(json.dumps(other.snapshot()))
+
+            text = metrics.render_text(metrics.snapshots())
+
+        self.assertIn('yatube_db_queries_total{view="posts:index"} 5', text)
+        self.assertIn('yatube_http_request_duration_seconds_bucket{'
+                      'view="posts:index",le="0.025"} 1', text)
+        self.assertIn('yatube_http_request_duration_seconds_bucket{'
+                      'view="posts:index",le="10.0"} 2', text)
+
+    def test_concurrent_flushes_write_one_file(self):
+        metrics.registry.inc("yatube_db_queries_total", view="posts:index")
+        errors = []
+
+        def flush():
+            try:
+                metrics.flush(force=True)
+            except Exception as error:
+                errors.append(error)
+
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_DIR=directory):
+            threads = [threading.Thread(target=flush) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            files = os.listdir(directory)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(files, [f"{os.getpid()}.json"])
@@ -0,0 +1,92 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from .. import profiling
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username="staff", is_staff=True)
+        cls.author = User.objects.create_user(username="author")
+        cls.post = Post.objects.create(text="Текст", author=cls.author)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(PROFILING_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def profiles(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_staff_token_profiles_request(self):
+        token = profiling.make_token("staff")
+        url = reverse("posts:post_detail", args=[self.post.id])
+
+        response = self.client.get(url, HTTP_X_PROFILE_TOKEN=token)
+
+        name = response["X-Profile"]
+        self.assertIn("posts_post_detail", name)
+        self.assertEqual(
+            self.profiles(), [f"{name}.collapsed", f"{name}.prof"])
+        with open(os.path.join(self.directory, f"{name}.collapsed")) as f:
+            for line in f:
+                _, count = line.rsplit(" ", 1)
+                self.assertGreater(int(count), 0)
+
+    def test_query_parameter_token(self):
+        token = profiling.make_token("staff")
+
+        response = self.client.get(
+            reverse("posts:profile", args=["author"]), {"profile": token})
+
+        self.assertIn("posts_profile", response["X-Profile"])
+
+    def test_invalid_tokens_are_ignored(self):
+        url = reverse("posts:index")
+        for token in ("подделка", profiling.make_token("author"),
+                      profiling.make_token("staff") + "x"):
+            with self.subTest(token=token):
+                response = self.client.get(url, HTTP_X_PROFILE_TOKEN=token)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.has_header("X-Profile"))
+        self.assertEqual(self.profiles(), [])
+
+    @override_settings(PROFILING_SAMPLE_EVERY=1)
+    def test_sampled_requests_are_saved_without_header(self):
+        response = self.client.get(reverse("posts:index"))
+
+        self.assertFalse(response.has_header("X-Profile"))
+        self.assertEqual(len(self.profiles()), 2)
+
+    def test_old_profiles_are_pruned(self):
+        for number in range(3):
+            path = os.path.join(self.directory, f"old{number}.prof")
+            with open(path, "wb") as old:
+                old.write(b"x" * 100)
+            os.utime(path, (number, number))
+
+        profiling.prune(self.directory, 250)
+
+        self.assertEqual(self.profiles(), ["old1.prof", "old2.prof"])
+
+    def test_profile_token_command(self):
+        stdout = StringIO()
+        call_command(
+            "profile_token", "staff", stdout=stdout, stderr=StringIO())
+
+        self.assertIsNotNone(profiling.token_user(stdout.getvalue().strip()))
+        with self.assertRaises(CommandError):
+            call_command("profile_token", "author")
@@ -0,0 +1,101 @@
+import logging
+
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve
+
+from core.middleware import QueryLogMiddleware
+from core.querylog import normalize_sql, record_queries
+from posts.models import Post, User
+
+
+class QueryLogTests(TestCase):
+    def test_query_origin_in_template(self):
+        author = User.objects.create_user(username="author")
+        Post.objects.create(text="Текст", author=author)
+        # Без select_related автор читается уже при отрисовке.
+        post = Post.objects.get()
+
+        with record_queries() as queries:
+            render_to_string("includes/article.html", {"post": post})
+
+        self.assertGreaterEqual(len(queries), 1)
+        self.assertIn("auth_user", queries.queries[0]["sql"])
+        self.assertTrue(queries.queries[0]["templates"][0].startswith(
+            "includes/article.html:"))
+        self.assertIn("includes/article.html", queries.report())
+
+
+@override_settings(
+    QUERYLOG_SAMPLE_RATE=1, QUERYLOG_SLOW_MS=1000,
+    QUERYLOG_REPEAT_THRESHOLD=3)
+class QueryLogMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username="author")
+        for number in range(3):
+            Post.objects.create(text=f"Пост {number}", author=author)
+
+    def get(self, view):
+        request = RequestFactory().get("/")
+        request.resolver_match = resolve("/")
+        return QueryLogMiddleware(view)(request)
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT  \"a\" FROM t1 WHERE x = 5 AND y IN (%s, %s)\n"
+                "AND z = 'it''s' LIMIT 21"),
+            'SELECT "a" FROM t1 WHERE x = ? AND y IN (...) AND z = ? LIMIT ?')
+
+    def test_repeated_queries_are_logged(self):
+        def view(request):
+            for post in Post.objects.all():
+                post.author.username
+            return HttpResponse()
+
+        with self.assertLogs("yatube.queries") as logs:
+            self.get(view)
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("N+1 в posts:index: 3 одинаковых", logs.output[0])
+        self.assertIn('FROM "auth_user" WHERE', logs.output[0])
+        self.assertIn("core/tests/test_querylog.py", logs.output[0])
+
+    def test_distinct_queries_are_not_logged(self):
+        def view(request):
+            list(Post.objects.select_related("author"))
+            return HttpResponse()
+
+        with self.assertLogs("yatube.queries") as logs:
+            self.get(view)
+            # assertLogs требует хотя бы одну запись.
+            logging.getLogger("yatube.queries").warning("конец")
+
+        self.assertEqual(logs.output, ["WARNING:yatube.queries:конец"])
+
+    @override_settings(QUERYLOG_SLOW_MS=0)
+    def test_slow_queries_are_logged(self):
+        def view(request):
+            Post.objects.count()
+            return HttpResponse()
+
+        with self.assertLogs("yatube.queries") as logs:
+            self.get(view)
+
+        self.assertIn("Медленный запрос", logs.output[0])
+        self.assertIn("posts:index", logs.output[0])
+        self.assertIn('SELECT COUNT(*)', logs.output[0])
+
+    @override_settings(QUERYLOG_SAMPLE_RATE=0, QUERYLOG_SLOW_MS=0)
+    def test_unsampled_requests_are_not_watched(self):
+        def view(request):
+            Post.objects.count()
+            return HttpResponse()
+
+        with self.assertLogs("yatube.queries") as logs:
+            self.get(view)
+            logging.getLogger("yatube.queries").warning("конец")
+
+        self.assertEqual(len(logs.output), 1)
@@ -0,0 +1,24 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+
+class SqliteTuningTests(TestCase):
+    def test_pragmas_are_applied_to_connection(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            synchronous = cursor.fetchone()[0]
+
+        self.assertEqual(synchronous, 1)
+
+    def test_benchmark_reports_both_profiles(self):
+        out = StringIO()
+
+        call_command(
+            "bench_sqlite", seconds=0.1, rows=100, readers=1, writers=1,
+            stdout=out)
+
+        self.assertIn("stock:", out.getvalue())
+        self.assertIn("tuned:", out.getvalue())
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_safe
+
+from . import metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_safe
+def metrics_view(request):
+    """Метрики всех воркеров в текстовом формате Prometheus."""
+    allowed = settings.METRICS_ALLOWED_IPS
+    if allowed is not None and request.META.get("REMOTE_ADDR") not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.render_text(metrics.snapshots()), content_type=CONTENT_TYPE)
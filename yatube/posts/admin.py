@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.db.models.expressions import RawSQL
+
+from . import search
 from .models import Post, Group
 
 
@@ -9,6 +12,13 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search.fts_available():
+            return super().get_search_results(
+                request, queryset, search_term)
+        ids = RawSQL(*search.matching_ids_sql(search_term))
+        return queryset.filter(pk__in=ids), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
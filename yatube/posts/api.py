@@ -0,0 +1,173 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+
+from . import counters
+from .conditional import conditional_page, feed_last_modified, not_modified
+from .models import Group, Post, User
+from .paginator import CursorPaginator, decode_cursor, encode_key
+
+# Поля поста в ответе API. Строки берутся из .values(),
+# объекты моделей не создаются.
+POST_FIELDS = ("id", "text", "pub_date", "edit_date")
+POST_RELATED_FIELDS = {
+    "username": F("author__username"),
+    "group_slug": F("group__slug"),
+}
+
+encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+class BadRequest(Exception):
+    pass
+
+
+def post_rows(post_list):
+    return post_list.values(*POST_FIELDS, **POST_RELATED_FIELDS)
+
+
+def page_size(query):
+    raw = query.get("limit")
+    if raw is None:
+        return settings.POSTS_API_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise BadRequest("limit должен быть целым числом")
+    if not 1 <= limit <= settings.POSTS_API_MAX_PAGE_SIZE:
+        raise BadRequest(
+            "limit должен быть от 1 до "
+            f"{settings.POSTS_API_MAX_PAGE_SIZE}")
+    return limit
+
+
+def page_rows(post_list, query):
+    """Строки страницы после курсора и признаки соседних страниц.
+
+    Вперёд строки читаются итератором и кодируются по одной;
+    назад их не больше limit + 1, и они разворачиваются в списке.
+    """
+    limit = page_size(query)
+    token, backwards = (
+        (query["before"], True) if "before" in query
+        else (query.get("after"), False))
+    key = None
+    if token is not None:
+        key = decode_cursor(token)
+        if key is None:
+            raise BadRequest("Неверный курсор")
+
+    paginator = CursorPaginator(post_rows(post_list), limit)
+    if key is None:
+        rows = paginator.object_list[:limit + 1]
+    else:
+        rows = paginator.cursor_queryset(key, backwards)
+
+    if backwards:
+        rows = list(rows)
+        has_more = len(rows) > limit
+        rows = rows[:limit][::-1]
+        return iter(rows), limit, True, has_more
+    return rows.iterator(), limit, None, key is not None
+
+
+def cursor(row):
+    return encode_key(row["pub_date"], row["id"])
+
+
+def stream_page(rows, limit, has_next, has_previous):
+    """Кодирует страницу по частям: {"results": [...], "next", "previous"}.
+
+    has_next равен None, если это станет ясно только после
+    чтения лишней строки.
+    """
+    yield '{"results":['
+    first = last = None
+    for number, row in enumerate(rows):
+        if number == limit:
+            has_next = True
+            break
+        if first is None:
+            first = row
+        else:
+            yield ","
+        last = row
+        yield encoder.encode(row)
+    yield "],"
+    yield encoder.encode({
+        "next": cursor(last) if has_next and last else None,
+        "previous": cursor(first) if has_previous and first else None,
+    })[1:]
+
+
+def api_view(view):
+    """Ошибки API отдаются JSON-ом, страницы - с валидаторами."""
+    checked_view = require_safe(conditional_page(view))
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return checked_view(request, *args, **kwargs)
+        except BadRequest as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        except Http404:
+            return JsonResponse({"error": "Не найдено"}, status=404)
+
+    return wrapper
+
+
+def feed_response(request, post_list, post_count):
+    response = not_modified(
+        request, feed_last_modified(post_list), post_count)
+    if response is not None:
+        return response
+    return StreamingHttpResponse(
+        stream_page(*page_rows(post_list, request.GET)),
+        content_type="application/json")
+
+
+def get_or_404(queryset, **lookup):
+    row = queryset.filter(**lookup).values("id").first()
+    if row is None:
+        raise Http404
+    return row["id"]
+
+
+@api_view
+def index(request):
+    return feed_response(
+        request, Post.objects.all(), counters.get_count(counters.ALL_POSTS))
+
+
+@api_view
+def group_posts(request, slug):
+    group_id = get_or_404(Group.objects, slug=slug)
+    return feed_response(
+        request,
+        Post.objects.filter(group_id=group_id),
+        counters.get_count(counters.group_key(group_id)))
+
+
+@api_view
+def profile(request, username):
+    author_id = get_or_404(User.objects, username=username)
+    return feed_response(
+        request,
+        Post.objects.filter(author_id=author_id),
+        counters.get_count(counters.author_key(author_id)))
+
+
+@api_view
+def post_detail(request, post_id):
+    row = post_rows(Post.objects.filter(pk=post_id)).first()
+    if row is None:
+        raise Http404
+    response = not_modified(request, row["edit_date"])
+    if response is not None:
+        return response
+    return JsonResponse(row, json_dumps_params={
+        "ensure_ascii": False, "separators": (",", ":")})
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+CARD_TEMPLATE = "includes/article.html"
+# Ленты, в которых карточка поста выглядит по-разному.
+CARD_VARIANTS = ("index", "group", "profile")
+
+
+def card_key(variant, post_id):
+    return f"posts:card:{variant}:{post_id}"
+
+
+def card_version(post):
+    return post.edit_date.isoformat()
+
+
+def render_cards(posts, variant):
+    """Возвращает пары (пост, html карточки) для страницы ленты.
+
+    Все карточки страницы читаются из кеша одним get_many,
+    отрисовываются только отсутствующие или устаревшие.
+    """
+    keys = {post.pk: card_key(variant, post.pk) for post in posts}
+    cached = cache.get_many(list(keys.values()))
+    cards = []
+    missing = {}
+    for post in posts:
+        version, html = cached.get(keys[post.pk], (None, None))
+        if version != card_version(post):
+            html = render_to_string(
+                CARD_TEMPLATE, {"post": post, "variant": variant})
+            missing[keys[post.pk]] = (card_version(post), str(html))
+        cards.append((post, mark_safe(html)))
+    if missing:
+        cache.set_many(missing, settings.POSTS_CARD_CACHE_TIMEOUT)
+    return cards
+
+
+def forget_cards(post_ids):
+    cache.delete_many([
+        card_key(variant, post_id)
+        for post_id in post_ids
+        for variant in CARD_VARIANTS
+    ])
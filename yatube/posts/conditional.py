@@ -0,0 +1,63 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from . import versions
+
+
+def last_modified_queryset(post_list):
+    return post_list.order_by("-edit_date").values_list(
+        "edit_date", flat=True)
+
+
+def feed_last_modified(post_list):
+    """Время последнего изменения поста ленты, один запрос по индексу."""
+    return last_modified_queryset(post_list).first()
+
+
+def make_etag(request, *parts):
+    site_version = versions.get_versions([versions.SITE])[versions.SITE]
+    raw = ":".join(str(part) for part in (
+        request.get_full_path(),
+        site_version,
+        *parts,
+    ))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def not_modified(request, *parts):
+    """Ответ 304, если у клиента актуальная страница, иначе None.
+
+    Страница сверяется только по ETag. Время правки поста не меняется,
+    когда пост удалён или переименованы автор и группа, поэтому
+    Last-Modified отдал бы устаревшую страницу клиенту, который
+    присылает только If-Modified-Since. Валидатор запоминается
+    в запросе, `conditional_page` добавит его в заголовки ответа.
+    """
+    etag = make_etag(request, *parts)
+    request.validators = (etag, None)
+    return get_conditional_response(request, etag=etag)
+
+
+def set_validators(response, etag, timestamp):
+    response["ETag"] = etag
+    if timestamp:
+        response["Last-Modified"] = http_date(timestamp)
+
+
+def conditional_page(view):
+    """Отдаёт валидаторы, посчитанные представлением.
+
+    Ответ 304 тоже несёт ETag, как требует RFC 7232, раздел 4.1.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        validators = getattr(request, "validators", None)
+        if validators is not None and response.status_code in (200, 304):
+            set_validators(response, *validators)
+        return response
+
+    return wrapper
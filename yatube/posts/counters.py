@@ -0,0 +1,128 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Follow, Post, PostCounter
+
+ALL_POSTS = "posts"
+
+
+def author_key(author_id):
+    return f"author:{author_id}"
+
+
+def group_key(group_id):
+    return f"group:{group_id}"
+
+
+def followers_key(author_id):
+    return f"followers:{author_id}"
+
+
+def post_keys(author_id, group_id):
+    """Ключи всех счётчиков, в которые входит пост."""
+    keys = [ALL_POSTS, author_key(author_id)]
+    if group_id is not None:
+        keys.append(group_key(group_id))
+    return keys
+
+
+def cache_key(key):
+    return f"posts:counter:{key}"
+
+
+def get_count(key):
+    """Значение счётчика: из кеша, а при промахе из таблицы счётчиков."""
+    count = cache.get(cache_key(key))
+    if count is None:
+        count = (
+            PostCounter.objects
+            .filter(key=key)
+            .values_list("count", flat=True)
+            .first()) or 0
+        cache.set(cache_key(key), count, settings.POSTS_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def get_counts(keys):
+    """Значения нескольких счётчиков: одно обращение к кешу и к базе."""
+    keys = list(keys)
+    cached = cache.get_many([cache_key(key) for key in keys])
+    counts = {
+        key: cached[cache_key(key)]
+        for key in keys if cache_key(key) in cached
+    }
+    missing = [key for key in keys if key not in counts]
+    if missing:
+        stored = dict(
+            PostCounter.objects
+            .filter(key__in=missing)
+            .values_list("key", "count"))
+        fetched = {key: stored.get(key, 0) for key in missing}
+        cache.set_many(
+            {cache_key(key): count for key, count in fetched.items()},
+            settings.POSTS_COUNT_CACHE_TIMEOUT)
+        counts.update(fetched)
+    return counts
+
+
+def change(keys, delta):
+    """Атомарно сдвигает счётчики на delta, создавая недостающие."""
+    for key in keys:
+        updated = (
+            PostCounter.objects
+            .filter(key=key)
+            .update(count=F("count") + delta))
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                PostCounter.objects.create(key=key, count=delta)
+        except IntegrityError:
+            # Счётчик успел создать параллельный запрос.
+            PostCounter.objects.filter(key=key).update(
+                count=F("count") + delta)
+    cache.delete_many([cache_key(key) for key in keys])
+
+
+def forget(key):
+    PostCounter.objects.filter(key=key).delete()
+    cache.delete(cache_key(key))
+
+
+def actual_counts():
+    """Точные значения всех счётчиков, посчитанные по таблице постов."""
+    # order_by() убирает сортировку Post.Meta.ordering из GROUP BY.
+    posts = Post.objects.order_by()
+    counts = Counter({ALL_POSTS: posts.count()})
+    for row in posts.values("author").annotate(n=Count("id")):
+        counts[author_key(row["author"])] = row["n"]
+    by_group = (
+        posts
+        .filter(group__isnull=False)
+        .values("group")
+        .annotate(n=Count("id")))
+    for row in by_group:
+        counts[group_key(row["group"])] = row["n"]
+    for row in Follow.objects.values("author").annotate(n=Count("id")):
+        counts[followers_key(row["author"])] = row["n"]
+    return counts
+
+
+@transaction.atomic
+def recount():
+    """Пересчитывает все счётчики заново, возвращает число исправленных."""
+    counts = actual_counts()
+    stored = dict(PostCounter.objects.values_list("key", "count"))
+    fixed = sum(
+        1 for key in stored.keys() | counts.keys()
+        if stored.get(key) != counts.get(key))
+    PostCounter.objects.all().delete()
+    PostCounter.objects.bulk_create(
+        PostCounter(key=key, count=count) for key, count in counts.items())
+    cache.delete_many(
+        [cache_key(key) for key in stored.keys() | counts.keys()])
+    return fixed
@@ -0,0 +1,64 @@
+import csv
+import json
+
+from .models import Post
+
+# Те же поля и имена, что читает `posts.importer`.
+EXPORT_FIELDS = ("author", "text", "group", "pub_date")
+EXPORT_COLUMNS = ("author__username", "text", "group__slug", "pub_date")
+FORMATS = ("jsonl", "csv")
+CONTENT_TYPES = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+}
+CHUNK_SIZE = 2000
+
+
+def export_queryset(author=None, group=None, since=None, until=None):
+    """Посты в порядке публикации, отобранные по индексам лент."""
+    posts = Post.objects.order_by("pub_date", "id")
+    if author is not None:
+        posts = posts.filter(author=author)
+    if group is not None:
+        posts = posts.filter(group=group)
+    if since is not None:
+        posts = posts.filter(pub_date__gte=since)
+    if until is not None:
+        posts = posts.filter(pub_date__lt=until)
+    return posts
+
+
+def export_rows(posts, chunk_size=CHUNK_SIZE):
+    """Кортежи полей EXPORT_FIELDS, читаемые из базы порциями."""
+    return posts.values_list(*EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+
+
+class Echo:
+    """Файл для csv.writer, который просто возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for author, text, group, pub_date in rows:
+        yield writer.writerow(
+            (author, text, group or "", pub_date.isoformat()))
+
+
+def jsonl_lines(rows):
+    for author, text, group, pub_date in rows:
+        record = {
+            "author": author,
+            "text": text,
+            "group": group,
+            "pub_date": pub_date.isoformat(),
+        }
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def export_lines(posts, file_format, chunk_size=CHUNK_SIZE):
+    lines = csv_lines if file_format == "csv" else jsonl_lines
+    return lines(export_rows(posts, chunk_size))
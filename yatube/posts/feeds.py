@@ -0,0 +1,148 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe
+
+from . import versions
+from .conditional import set_validators
+from .models import CARD_FIELDS, Group, Post, User
+from .page_cache import cache_public_page, depend_on
+
+# Читатели лент получают полный текст поста, а не только начало.
+FEED_FIELDS = (*CARD_FIELDS, "text")
+
+
+class PostFeed(Feed):
+    """Общая часть лент: посты берутся теми же запросами, что и страницы."""
+
+    def items(self, obj):
+        return self.feed_posts(obj)[:settings.POSTS_FEED_ITEMS]
+
+    def item_title(self, post):
+        return post.excerpt[:Post.STR_REPR_LEN]
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse("posts:post_detail", kwargs={"post_id": post.id})
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.edit_date
+
+    def item_categories(self, post):
+        if post.group is None:
+            return ()
+        return (post.group.title,)
+
+
+class IndexFeed(PostFeed):
+    title = "Последние обновления на сайте"
+    description = "Новые посты всех авторов Yatube"
+
+    def get_object(self, request):
+        depend_on(request, versions.INDEX)
+
+    def link(self):
+        return reverse("posts:index")
+
+    def feed_posts(self, obj):
+        # Для категорий нужно название группы, которого нет в карточке.
+        return Post.objects.index_feed().only(*FEED_FIELDS, "group__title")
+
+
+class GroupFeed(PostFeed):
+    def get_object(self, request, slug):
+        depend_on(request, versions.group_scope(slug))
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f"Записи сообщества {group.title}"
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse("posts:group_list", kwargs={"slug": group.slug})
+
+    def feed_posts(self, group):
+        return Post.objects.group_feed(group).only(*FEED_FIELDS, "group")
+
+    def item_categories(self, post):
+        return ()
+
+
+class AuthorFeed(PostFeed):
+    def get_object(self, request, username):
+        depend_on(request, versions.author_scope(username))
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f"Посты пользователя {author.get_full_name() or author}"
+
+    def description(self, author):
+        return self.title(author)
+
+    def link(self, author):
+        return reverse("posts:profile", kwargs={"username": author.username})
+
+    def feed_posts(self, author):
+        return Post.objects.author_feed(author).only(
+            *FEED_FIELDS, "group__title")
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr("description", obj)
+
+
+class IndexAtomFeed(AtomFeedMixin, IndexFeed):
+    pass
+
+
+class GroupAtomFeed(AtomFeedMixin, GroupFeed):
+    pass
+
+
+class AuthorAtomFeed(AtomFeedMixin, AuthorFeed):
+    pass
+
+
+def cached_feed(feed):
+    """Представление ленты: кеш до нового поста и валидаторы.
+
+    Лента одинакова для всех, поэтому опрос без новых постов
+    отвечает из кеша и не обращается к базе даже за сессией.
+    """
+    @cache_public_page
+    def view(request, *args, **kwargs):
+        response = feed(request, *args, **kwargs)
+        etag = quote_etag(hashlib.md5(response.content).hexdigest())
+        timestamp = parse_http_date_safe(response.get("Last-Modified", ""))
+        request.validators = (etag, timestamp)
+        set_validators(response, etag, timestamp)
+        return get_conditional_response(
+            request, etag=etag, last_modified=timestamp, response=response)
+
+    return view
+
+
+index_rss = cached_feed(IndexFeed())
+index_atom = cached_feed(IndexAtomFeed())
+group_rss = cached_feed(GroupFeed())
+group_atom = cached_feed(GroupAtomFeed())
+author_rss = cached_feed(AuthorFeed())
+author_atom = cached_feed(AuthorAtomFeed())
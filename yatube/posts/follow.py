@@ -0,0 +1,154 @@
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from core import jobs
+
+from . import counters
+from .models import FeedItem, Follow, Post
+
+
+def is_celebrity(follower_count):
+    return follower_count > settings.POSTS_FANOUT_MAX_FOLLOWERS
+
+
+def has_push_followers(author_id):
+    follower_count = counters.get_count(counters.followers_key(author_id))
+    return 0 < follower_count and not is_celebrity(follower_count)
+
+
+@jobs.task
+def deliver(post_id):
+    """Добавляет пост в ленты подписчиков автора пачками.
+
+    Посты авторов, у которых подписчиков больше
+    POSTS_FANOUT_MAX_FOLLOWERS, не рассылаются: ленты читают их сами.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not has_push_followers(post.author_id):
+        return 0
+    follower_ids = (
+        Follow.objects
+        .filter(author_id=post.author_id)
+        .values_list("user_id", flat=True))
+    follower_ids = follower_ids.iterator(
+        chunk_size=settings.POSTS_FANOUT_BATCH_SIZE)
+    delivered = 0
+    # Размер пачки для INSERT Django подбирает сам: явный batch_size
+    # больше 500 SQLite не принимает.
+    while True:
+        items = [
+            FeedItem(user_id=user_id, post_id=post.pk, pub_date=post.pub_date)
+            for user_id in islice(
+                follower_ids, settings.POSTS_FANOUT_BATCH_SIZE)
+        ]
+        if not items:
+            return delivered
+        FeedItem.objects.bulk_create(items, ignore_conflicts=True)
+        delivered += len(items)
+
+
+def schedule_delivery(post):
+    """Ставит рассылку поста в очередь задач, не задерживая запрос."""
+    if not has_push_followers(post.author_id):
+        return
+    if not settings.POSTS_FANOUT_ASYNC:
+        deliver(post.pk)
+        return
+    jobs.enqueue(deliver, post_id=post.pk)
+
+
+def backfill(user, author):
+    """Добавляет в ленту нового подписчика последние посты автора."""
+    posts = (
+        Post.objects
+        .filter(author=author)
+        .values_list("pk", "pub_date")[:settings.POSTS_FOLLOW_BACKFILL])
+    FeedItem.objects.bulk_create(
+        [
+            FeedItem(user=user, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ],
+        ignore_conflicts=True)
+
+
+def forget_author(user, author):
+    FeedItem.objects.filter(user=user, post__author=author).delete()
+
+
+def cursor_condition(key, backwards, post_field):
+    pub_date, pk = key
+    if backwards:
+        return Q(pub_date__gte=pub_date) & ~Q(
+            pub_date=pub_date, **{f"{post_field}__lte": pk})
+    return Q(pub_date__lte=pub_date) & ~Q(
+        pub_date=pub_date, **{f"{post_field}__gte": pk})
+
+
+class FollowFeed:
+    """Лента подписок: разосланные посты плюс посты знаменитостей.
+
+    Каждый источник читается по своему индексу не дальше нужной
+    страницы, результаты сливаются по ключу (pub_date, id). Лента
+    листается только курсорами: номер страницы или общее число постов
+    потребовали бы читать каждый источник от начала.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def celebrity_ids(self):
+        author_ids = list(
+            Follow.objects
+            .filter(user=self.user)
+            .values_list("author_id", flat=True))
+        follower_counts = counters.get_counts(
+            counters.followers_key(author_id) for author_id in author_ids)
+        return [
+            author_id for author_id in author_ids
+            if is_celebrity(
+                follower_counts[counters.followers_key(author_id)])
+        ]
+
+    def sources(self, key, backwards):
+        ordering = ("pub_date", "post") if backwards else (
+            "-pub_date", "-post")
+        inbox = FeedItem.objects.filter(user=self.user)
+        if key is not None:
+            inbox = inbox.filter(cursor_condition(key, backwards, "post"))
+        yield inbox.order_by(*ordering).values_list("pub_date", "post")
+
+        ordering = ("pub_date", "pk") if backwards else ("-pub_date", "-pk")
+        for author_id in self.celebrity_ids:
+            posts = Post.objects.filter(author_id=author_id)
+            if key is not None:
+                posts = posts.filter(cursor_condition(key, backwards, "pk"))
+            yield posts.order_by(*ordering).values_list("pub_date", "pk")
+
+    def keys(self, key, backwards, limit):
+        """Ключи (pub_date, id) первых limit постов после key."""
+        merged = heapq.merge(
+            *(source[:limit] for source in self.sources(key, backwards)),
+            reverse=not backwards)
+        keys = []
+        seen = set()
+        for pub_date, pk in merged:
+            if pk not in seen:
+                seen.add(pk)
+                keys.append((pub_date, pk))
+            if len(keys) == limit:
+                break
+        return keys
+
+    def posts(self, keys):
+        ids = [pk for _, pk in keys]
+        posts = Post.objects.index_feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+    def cursor_slice(self, key, backwards, limit):
+        """Первые limit постов после key; None - от начала ленты."""
+        return self.posts(self.keys(key, backwards, limit))
@@ -0,0 +1,29 @@
+from django.shortcuts import render
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_safe
+
+from .models import Follow
+
+
+def fragment_view(view):
+    """Персональная часть страницы: только этому пользователю, без кеша."""
+    return require_safe(cache_control(private=True, no_cache=True)(view))
+
+
+@fragment_view
+def nav(request):
+    return render(request, "includes/user_nav.html")
+
+
+@fragment_view
+def profile_actions(request, username):
+    following = (
+        request.user.is_authenticated
+        and request.user.username != username
+        and Follow.objects.filter(
+            user=request.user, author__username=username).exists())
+    context = {
+        "username": username,
+        "following": following,
+    }
+    return render(request, "posts/includes/profile_actions.html", context)
@@ -0,0 +1,219 @@
+import csv
+import json
+import os
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters, search, versions
+from .models import Group, ImportCheckpoint, Post, User
+
+FORMATS = ("jsonl", "csv")
+# Столбцы постов, которые импорт и команда seed пишут напрямую.
+POST_FIELDS = (
+    "text", "excerpt", "is_excerpt_partial", "pub_date", "edit_date",
+    "author", "group")
+
+
+class RecordError(ValueError):
+    pass
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension == "json":
+        return "jsonl"
+    if extension not in FORMATS:
+        raise RecordError(
+            f"Не удалось определить формат файла {path}, укажите --format")
+    return extension
+
+
+def read_records(path, file_format):
+    """Записи файла по одной: файл целиком в память не читается."""
+    with open(path, encoding="utf-8", newline="") as source:
+        if file_format == "csv":
+            yield from csv.DictReader(source)
+            return
+        for line in source:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Запись пропускается, номера остальных не сдвигаются.
+                yield None
+
+
+def checkpoint_name(source):
+    return os.path.abspath(source)
+
+
+def read_checkpoint(name):
+    """Сколько записей уже импортировано по данным контрольной точки."""
+    return (
+        ImportCheckpoint.objects
+        .filter(name=name)
+        .values_list("position", flat=True)
+        .first()) or 0
+
+
+def save_checkpoint(name, position):
+    ImportCheckpoint.objects.update_or_create(
+        name=name, defaults={"position": position})
+
+
+def remove_checkpoint(name):
+    ImportCheckpoint.objects.filter(name=name).delete()
+
+
+def insert_sql():
+    """INSERT одного поста со значениями в порядке POST_FIELDS."""
+    fields = [Post._meta.get_field(name) for name in POST_FIELDS]
+    columns = ", ".join(
+        connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    return (
+        f"INSERT INTO {connection.ops.quote_name(Post._meta.db_table)} "
+        f"({columns}) VALUES ({placeholders})")
+
+
+def record_string(record, name):
+    """Строковое поле записи или None, если поля нет."""
+    value = record.get(name)
+    if value is not None and not isinstance(value, str):
+        raise RecordError(f"Поле {name} должно быть строкой: {value!r}")
+    return value
+
+
+def record_date(record, name):
+    """Дата из поля записи или None, если поля нет."""
+    raw = record_string(record, name)
+    if not raw:
+        return None
+    try:
+        # Дата вида 2020-02-30 проходит разбор по шаблону,
+        # но не создаётся: datetime бросает ValueError.
+        value = parse_datetime(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise RecordError(f"Неверная дата {raw!r}")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def string_values(records, name):
+    values = (record.get(name) for record in records)
+    return {value for value in values if value and isinstance(value, str)}
+
+
+class PostImporter:
+    """Превращает записи в посты и вставляет их пачками.
+
+    Авторы и группы ищутся по username и slug через словари,
+    которые пополняются одним запросом на пачку.
+    Посты вставляются через executemany, как в команде seed: так
+    pub_date из файла сохраняется без отключения auto_now_add.
+    Сигналы при этом не отправляются, поэтому счётчики, поисковый
+    индекс и версии кешей обновляются здесь же, раз на пачку.
+    """
+
+    def __init__(self):
+        self.author_ids = {}
+        self.group_ids = {}
+
+    def resolve(self, records):
+        usernames = string_values(records, "author") - self.author_ids.keys()
+        slugs = string_values(records, "group") - self.group_ids.keys()
+        if usernames:
+            self.author_ids.update(
+                User.objects
+                .filter(username__in=usernames)
+                .values_list("username", "id"))
+        if slugs:
+            self.group_ids.update(
+                Group.objects
+                .filter(slug__in=slugs)
+                .values_list("slug", "id"))
+
+    def build_post(self, record, now):
+        if not isinstance(record, dict):
+            raise RecordError("Запись не разобрана")
+        text = record_string(record, "text")
+        if not text:
+            raise RecordError("Нет текста поста")
+        username = record_string(record, "author")
+        author_id = self.author_ids.get(username)
+        if author_id is None:
+            raise RecordError(f"Нет автора {username!r}")
+        group_id = None
+        slug = record_string(record, "group")
+        if slug:
+            group_id = self.group_ids.get(slug)
+            if group_id is None:
+                raise RecordError(f"Нет группы {slug!r}")
+
+        pub_date = record_date(record, "pub_date") or now
+        post = Post(
+            text=text, author_id=author_id, group_id=group_id,
+            pub_date=pub_date)
+        post.fill_excerpt()
+        return post
+
+    def build_posts(self, records):
+        """Посты из записей пачки и число пропущенных записей."""
+        self.resolve([
+            record for record in records if isinstance(record, dict)])
+        now = timezone.now()
+        posts = []
+        for record in records:
+            try:
+                posts.append(self.build_post(record, now))
+            except RecordError:
+                continue
+        return posts, len(records) - len(posts)
+
+    def insert(self, posts, checkpoint=None, position=0):
+        """Вставляет посты пачки и сдвигает контрольную точку.
+
+        Посты и позиция пишутся одной транзакцией: после сбоя
+        пачка не окажется вставленной дважды.
+        """
+        deltas = Counter()
+        for post in posts:
+            deltas.update(counters.post_keys(post.author_id, post.group_id))
+        adapt = connection.ops.adapt_datetimefield_value
+        now = adapt(timezone.now())
+        rows = [
+            (post.text, post.excerpt, post.is_excerpt_partial,
+             adapt(post.pub_date), now, post.author_id, post.group_id)
+            for post in posts
+        ]
+
+        with transaction.atomic():
+            if rows:
+                last_id = Post.objects.aggregate(
+                    last_id=Max("id"))["last_id"]
+                with connection.cursor() as cursor:
+                    cursor.executemany(insert_sql(), rows)
+                search.index_posts_after(last_id or 0)
+                for key, delta in deltas.items():
+                    counters.change([key], delta)
+            if checkpoint is not None:
+                save_checkpoint(checkpoint, position)
+
+        usernames = {
+            author_id: username
+            for username, author_id in self.author_ids.items()
+        }
+        slugs = {group_id: slug for slug, group_id in self.group_ids.items()}
+        scopes = set()
+        for post in posts:
+            scopes.update(versions.feed_scopes(
+                usernames[post.author_id], slugs.get(post.group_id)))
+        versions.bump(*scopes)
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posts.conditional import last_modified_queryset
+from posts.models import Group, Post, User
+from posts.paginator import CursorPaginator
+from posts.views import POSTS_PER_PAGE
+
+TEMP_SORT = "USE TEMP B-TREE"
+
+
+def feed_queries():
+    """Все запросы лент в том виде, в котором их выполняют представления."""
+    key = (timezone.now(), 0)
+    feeds = {
+        "index": Post.objects.index_feed(),
+        "group_posts": Post.objects.group_feed(Group(pk=0)),
+        "profile": Post.objects.author_feed(User(pk=0)),
+    }
+    for name, post_list in feeds.items():
+        paginator = CursorPaginator(post_list, POSTS_PER_PAGE)
+        yield f"{name}: page", post_list[:POSTS_PER_PAGE]
+        yield f"{name}: after", paginator.cursor_queryset(key)
+        yield f"{name}: before", paginator.cursor_queryset(key, True)
+        yield f"{name}: last modified", last_modified_queryset(post_list)[:1]
+
+
+def plan_problems(plan):
+    """Строки плана с сортировкой во временном B-дереве или полным обходом."""
+    problems = []
+    for line in plan.splitlines():
+        detail = line.split(maxsplit=3)[-1]
+        is_full_scan = detail.startswith("SCAN") and "USING" not in detail
+        if TEMP_SORT in detail or is_full_scan:
+            problems.append(detail)
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет EXPLAIN QUERY PLAN для запросов лент и завершается "
+        "ошибкой, если какой-то из них сортирует без индекса "
+        "или читает всю таблицу."
+    )
+
+    def handle(self, *args, **options):
+        failed = []
+        for name, queryset in feed_queries():
+            plan = queryset.explain()
+            problems = plan_problems(plan)
+            if problems:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(name))
+            else:
+                self.stdout.write(self.style.SUCCESS(name))
+            if options["verbosity"] > 1 or problems:
+                self.stdout.write(plan)
+
+        if failed:
+            raise CommandError(
+                "Запросы без подходящего индекса: " + ", ".join(failed))
@@ -0,0 +1,69 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from posts import exporter
+from posts.models import Group, User
+
+
+def parse_moment(value):
+    """Дата или дата со временем из аргумента командной строки."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Неверная дата {value!r}")
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает посты в JSONL или CSV с полями author, text, group, "
+        "pub_date. Посты читаются из базы порциями, память не растёт "
+        "с размером выгрузки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=exporter.FORMATS, default="jsonl")
+        parser.add_argument(
+            "--output", help="Файл выгрузки, по умолчанию - stdout.")
+        parser.add_argument("--author", help="username автора.")
+        parser.add_argument("--group", help="slug группы.")
+        parser.add_argument(
+            "--since", type=parse_moment,
+            help="Посты, опубликованные не раньше этой даты.")
+        parser.add_argument(
+            "--until", type=parse_moment,
+            help="Посты, опубликованные раньше этой даты.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=exporter.CHUNK_SIZE,
+            help="Постов в одной порции чтения из базы.")
+
+    def handle(self, *args, **options):
+        filters = {"since": options["since"], "until": options["until"]}
+        try:
+            if options["author"]:
+                filters["author"] = User.objects.get(
+                    username=options["author"])
+            if options["group"]:
+                filters["group"] = Group.objects.get(slug=options["group"])
+        except (User.DoesNotExist, Group.DoesNotExist) as error:
+            raise CommandError(error)
+
+        lines = exporter.export_lines(
+            exporter.export_queryset(**filters),
+            options["format"],
+            options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8",
+                      newline="") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,84 @@
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует посты из файла JSONL или CSV с полями "
+        "author, text, group, pub_date. После прерывания продолжает "
+        "с последней сохранённой пачки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл с постами.")
+        parser.add_argument(
+            "--format", choices=importer.FORMATS,
+            help="Формат файла, по умолчанию - по расширению.")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Постов в одной транзакции.")
+        parser.add_argument(
+            "--checkpoint",
+            help=(
+                "Имя контрольной точки в базе, по умолчанию - полный "
+                "путь файла."))
+        parser.add_argument(
+            "--restart", action="store_true",
+            help="Начать сначала, не глядя на контрольную точку.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        checkpoint = (
+            options["checkpoint"] or importer.checkpoint_name(path))
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size должен быть положительным")
+
+        records, position = self.open_records(path, checkpoint, options)
+        if position:
+            self.stdout.write(f"Продолжение с записи {position}")
+
+        post_importer = importer.PostImporter()
+        imported = skipped = 0
+        started = time.monotonic()
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            posts, batch_skipped = post_importer.build_posts(batch)
+            position += len(batch)
+            post_importer.insert(posts, checkpoint, position)
+            imported += len(posts)
+            skipped += batch_skipped
+            if options["verbosity"] > 1:
+                self.stdout.write(self.progress(imported, skipped, started))
+
+        importer.remove_checkpoint(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            self.progress(imported, skipped, started)))
+
+    def open_records(self, path, checkpoint, options):
+        """Записи файла, начиная с контрольной точки, и её позиция."""
+        try:
+            file_format = options["format"] or importer.detect_format(path)
+            position = 0
+            if not options["restart"]:
+                position = importer.read_checkpoint(checkpoint)
+            records = importer.read_records(path, file_format)
+            # Записи до контрольной точки только читаются, без разбора полей.
+            for _ in islice(records, position):
+                pass
+        except (importer.RecordError, OSError) as error:
+            raise CommandError(error)
+        return records, position
+
+    def progress(self, imported, skipped, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        rate = (imported + skipped) / elapsed
+        return (
+            f"Импортировано постов: {imported}, пропущено записей: "
+            f"{skipped}, {rate:.0f} записей/с")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = "Заново строит полнотекстовый индекс постов."
+
+    def handle(self, *args, **options):
+        count = search.rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(f"Проиндексировано постов: {count}"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает счётчики постов и подписчиков авторов."
+
+    def handle(self, *args, **options):
+        fixed = counters.recount()
+        self.stdout.write(
+            self.style.SUCCESS(f"Исправлено счётчиков: {fixed}"))
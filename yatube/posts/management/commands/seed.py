@@ -0,0 +1,82 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from posts.seed import DEFAULT_END, Seeder
+
+
+def parse_end(value):
+    moment = parse_datetime(value)
+    if moment is None or moment.tzinfo is None:
+        raise CommandError(f"Неверная дата с часовым поясом {value!r}")
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу синтетическими пользователями, группами и постами. "
+        "Посты распределены по авторам и группам по закону Ципфа, "
+        "один и тот же --seed даёт одни и те же данные."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--groups", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=100000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--exponent", type=float, default=1.1,
+            help="Показатель закона Ципфа: чем больше, тем сильнее перекос.")
+        parser.add_argument(
+            "--ungrouped", type=float, default=0.2,
+            help="Доля постов без группы.")
+        parser.add_argument(
+            "--days", type=int, default=365,
+            help="За сколько дней до --end распределены посты.")
+        parser.add_argument(
+            "--end", type=parse_end, default=DEFAULT_END,
+            help="Дата последнего поста, ISO 8601 с часовым поясом.")
+        parser.add_argument(
+            "--prefix", default="seed",
+            help="Префикс имён пользователей и слагов групп.")
+        parser.add_argument(
+            "--password",
+            help="Пароль всех пользователей, по умолчанию войти нельзя.")
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 and options["posts"]:
+            raise CommandError("Постам нужен хотя бы один автор")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size должен быть положительным")
+
+        seeder = Seeder(
+            options["seed"],
+            prefix=options["prefix"],
+            exponent=options["exponent"],
+            batch_size=options["batch_size"])
+
+        author_ids = self.timed(
+            "Пользователи", options["users"],
+            seeder.create_users, options["users"], options["password"])
+        group_ids = self.timed(
+            "Группы", options["groups"],
+            seeder.create_groups, options["groups"])
+        end = options["end"]
+        self.timed(
+            "Посты", options["posts"],
+            seeder.create_posts, options["posts"], author_ids, group_ids,
+            options["ungrouped"], end - timedelta(days=options["days"]), end)
+        self.timed("Счётчики и поисковый индекс", None, seeder.finish)
+
+    def timed(self, title, count, function, *args):
+        started = time.monotonic()
+        result = function(*args)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        message = f"{title}: {elapsed:.1f} с"
+        if count:
+            message += f", {count} записей, {count / elapsed:.0f} записей/с"
+        self.stdout.write(self.style.SUCCESS(message))
+        return result
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:04
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostCounter = apps.get_model('posts', 'PostCounter')
+    # Без order_by() поля сортировки Meta.ordering попали бы в GROUP BY.
+    posts = Post.objects.order_by()
+
+    counters = [PostCounter(key='posts', count=posts.count())]
+    for row in posts.values('author').annotate(n=Count('id')):
+        counters.append(
+            PostCounter(key=f"author:{row['author']}", count=row['n']))
+    by_group = (
+        posts
+        .filter(group__isnull=False)
+        .values('group')
+        .annotate(n=Count('id')))
+    for row in by_group:
+        counters.append(
+            PostCounter(key=f"group:{row['group']}", count=row['n']))
+    PostCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Ключ')),
+                ('count', models.IntegerField(default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name': 'Счётчик постов',
+                'verbose_name_plural': 'Счётчики постов',
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:06
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_pub_date(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(edit_date=F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_postcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='edit_date',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(copy_pub_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:40
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+EXCERPT_LEN = 500
+BATCH_SIZE = 500
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.order_by('id').only('id', 'text')
+    batch = []
+    for post in posts.iterator(chunk_size=BATCH_SIZE):
+        post.excerpt = Truncator(post.text).chars(EXCERPT_LEN)
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_follow_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(default='', editable=False, max_length=500, verbose_name='Начало текста'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
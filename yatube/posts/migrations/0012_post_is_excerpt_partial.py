@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+def fill_excerpt_partial(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.exclude(excerpt=models.F('text')).update(
+        is_excerpt_partial=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_excerpt_partial',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Начало короче текста'),
+        ),
+        migrations.RunPython(fill_excerpt_partial, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils.text import Truncator
 
 
 User = get_user_model()
@@ -18,14 +19,62 @@ class Group(models.Model):
         return self.title
 
 
+# Поля, которые нужны карточке поста в лентах, см. includes/article.html.
+# Полный текст, хеш пароля и описание группы в ленты не читаются.
+CARD_FIELDS = (
+    "excerpt", "is_excerpt_partial", "pub_date", "edit_date",
+    "author__username", "author__first_name", "author__last_name",
+)
+
+
+class PostQuerySet(models.QuerySet):
+    """Запросы лент постов.
+
+    Каждая лента читается по индексу из `Post.Meta.indexes`,
+    это проверяет команда `check_query_plans`.
+    Ленты читают только поля карточки из CARD_FIELDS.
+    """
+
+    def index_feed(self):
+        return self.select_related("group", "author").only(
+            *CARD_FIELDS, "group__slug")
+
+    def group_feed(self, group):
+        return self.select_related("author").only(
+            *CARD_FIELDS, "group").filter(group=group)
+
+    def author_feed(self, author):
+        return self.select_related("author", "group").only(
+            *CARD_FIELDS, "group__slug").filter(author=author)
+
+
+def make_excerpt(text):
+    return Truncator(text).chars(Post.EXCERPT_LEN)
+
+
 class Post(models.Model):
     STR_REPR_LEN = 15
+    EXCERPT_LEN = 500
 
     text = models.TextField(verbose_name="Текст поста")
 
+    excerpt = models.CharField(
+        verbose_name="Начало текста",
+        max_length=EXCERPT_LEN,
+        default="",
+        editable=False)
+
+    is_excerpt_partial = models.BooleanField(
+        verbose_name="Начало короче текста",
+        default=False,
+        editable=False)
+
     pub_date = models.DateTimeField(
         verbose_name="Дата публикации", auto_now_add=True)
 
+    edit_date = models.DateTimeField(
+        verbose_name="Дата изменения", auto_now=True)
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -39,10 +88,142 @@ class Post(models.Model):
         null=True,
         verbose_name="Группа")
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
-        ordering = ["-pub_date"]
+        ordering = ["-pub_date", "-id"]
+        indexes = [
+            models.Index(fields=["pub_date"], name="post_pub_date_idx"),
+            models.Index(
+                fields=["author", "pub_date"],
+                name="post_author_pub_date_idx"),
+            models.Index(
+                fields=["group", "pub_date"],
+                name="post_group_pub_date_idx"),
+            models.Index(fields=["edit_date"], name="post_edit_date_idx"),
+            models.Index(
+                fields=["author", "edit_date"],
+                name="post_author_edit_date_idx"),
+            models.Index(
+                fields=["group", "edit_date"],
+                name="post_group_edit_date_idx"),
+        ]
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
 
     def __str__(self):
         return self.text[:Post.STR_REPR_LEN]
+
+    def fill_excerpt(self):
+        """Начало текста для лент и признак, что оно короче текста."""
+        self.excerpt = make_excerpt(self.text)
+        self.is_excerpt_partial = self.excerpt != self.text
+
+    def save(self, *args, **kwargs):
+        self.fill_excerpt()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "text" in update_fields:
+            kwargs["update_fields"] = {
+                *update_fields, "excerpt", "is_excerpt_partial"}
+        super().save(*args, **kwargs)
+
+
+class PostCounter(models.Model):
+    """Денормализованный счётчик: число постов в ленте или подписчиков.
+
+    Счётчики обновляются сигналами из `posts.signals`,
+    расхождения исправляет команда `recount_posts`.
+    """
+
+    key = models.CharField(verbose_name="Ключ", max_length=64, unique=True)
+    count = models.IntegerField(verbose_name="Значение", default=0)
+
+    class Meta:
+        verbose_name = "Счётчик"
+        verbose_name_plural = "Счётчики"
+
+    def __str__(self):
+        return f"{self.key}: {self.count}"
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="follower",
+        verbose_name="Подписчик")
+
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="following",
+        verbose_name="Автор")
+
+    class Meta:
+        verbose_name = "Подписка"
+        verbose_name_plural = "Подписки"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "author"], name="unique_follow"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} -> {self.author}"
+
+
+class FeedItem(models.Model):
+    """Пост в ленте подписок пользователя.
+
+    Посты авторов с небольшим числом подписчиков рассылаются
+    в ленты при публикации, см. `posts.follow`.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="feed_items",
+        verbose_name="Читатель")
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Пост")
+
+    pub_date = models.DateTimeField(verbose_name="Дата публикации")
+
+    class Meta:
+        verbose_name = "Запись ленты подписок"
+        verbose_name_plural = "Записи лент подписок"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="unique_feed_item"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "pub_date", "post"],
+                name="feed_item_user_pub_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user}: {self.post_id}"
+
+
+class ImportCheckpoint(models.Model):
+    """Сколько записей файла уже импортировала команда import_posts.
+
+    Позиция пишется в той же транзакции, что и пачка постов,
+    поэтому после сбоя импорт продолжается без повторов.
+    """
+
+    name = models.CharField(verbose_name="Имя", max_length=500, unique=True)
+    position = models.PositiveIntegerField(
+        verbose_name="Импортировано записей", default=0)
+    updated = models.DateTimeField(verbose_name="Обновлена", auto_now=True)
+
+    class Meta:
+        verbose_name = "Контрольная точка импорта"
+        verbose_name_plural = "Контрольные точки импорта"
+
+    def __str__(self):
+        return f"{self.name}: {self.position}"
@@ -0,0 +1,102 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from core import metrics
+from core.db_router import use_primary
+
+from . import versions
+from .conditional import set_validators
+
+CACHEABLE_METHODS = ("GET", "HEAD")
+
+
+def page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"posts:page:{request.resolver_match.view_name}:{path}"
+
+
+def depend_on(request, *scopes):
+    """Помечает кешируемую страницу зависящей от версий scopes.
+
+    Представление вызывает это до чтения данных области: если данные
+    изменятся во время отрисовки, страница сохранится со старой версией
+    и при следующем запросе будет отрисована заново.
+    """
+    dependencies = getattr(request, "page_cache_dependencies", None)
+    if dependencies is not None:
+        dependencies.update(versions.get_versions(scopes))
+
+
+def serve_cached(request):
+    entry = cache.get(page_key(request))
+    if entry is None:
+        return None
+    dependencies, content_type, content, validators = entry
+    if versions.get_versions(dependencies) != dependencies:
+        return None
+    response = HttpResponse(content, content_type=content_type)
+    if validators is None:
+        return response
+    set_validators(response, *validators)
+    etag, timestamp = validators
+    return get_conditional_response(
+        request, etag=etag, last_modified=timestamp, response=response)
+
+
+def cached_response(view, request, *args, **kwargs):
+    response = serve_cached(request)
+    view_name = request.resolver_match.view_name
+    if response is not None:
+        metrics.inc(
+            "yatube_page_cache_requests_total", view=view_name, result="hit")
+        return response
+    metrics.inc(
+        "yatube_page_cache_requests_total", view=view_name, result="miss")
+
+    request.page_cache_dependencies = {}
+    depend_on(request, versions.SITE)
+    # Отстающая реплика закешировала бы старую страницу под новой
+    # версией, поэтому промах отрисовывается по основной базе.
+    with use_primary():
+        response = view(request, *args, **kwargs)
+    if response.status_code == 200:
+        cache.set(
+            page_key(request),
+            (
+                request.page_cache_dependencies,
+                response["Content-Type"],
+                response.content,
+                getattr(request, "validators", None),
+            ),
+            settings.POSTS_PAGE_CACHE_TIMEOUT,
+        )
+    return response
+
+
+def cache_public_page(view):
+    """Кеширует страницу, одинаковую для всех посетителей.
+
+    Попадание обходится двумя обращениями к кешу и ни одним к базе:
+    сохранённая страница проверяется по версиям областей,
+    о зависимости от которых представление сообщило через `depend_on`.
+    Пользователь запроса не проверяется, поэтому попадание не читает
+    и сессию. Персональные части страницы шаблон подставляет
+    фрагментами, см. `request.shared_page` и тег `fragment`.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.shared_page = True
+        if request.method not in CACHEABLE_METHODS:
+            return view(request, *args, **kwargs)
+        response = cached_response(view, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            # Общие кеши хранят страницу, но сверяют её по ETag.
+            patch_cache_control(response, public=True, max_age=0)
+        return response
+
+    return wrapper
@@ -0,0 +1,231 @@
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+CURSOR_SEPARATOR = "|"
+
+
+def encode_key(pub_date, pk):
+    """Упаковывает ключ (pub_date, id) в непрозрачный токен."""
+    raw = f"{pub_date.isoformat()}{CURSOR_SEPARATOR}{pk}"
+    return urlsafe_base64_encode(raw.encode())
+
+
+def encode_cursor(post):
+    return encode_key(post.pub_date, post.pk)
+
+
+def decode_cursor(token):
+    """Возвращает ключ (pub_date, id) или None для битого токена."""
+    try:
+        raw = urlsafe_base64_decode(token).decode()
+        pub_date, pk = raw.rsplit(CURSOR_SEPARATOR, 1)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+class CursorPage(Page):
+    """Страница, которая умеет ссылаться на соседние страницы курсором.
+
+    Страница, полученная по номеру, ведёт себя как обычная `Page`.
+    Страница, полученная по курсору, номера не имеет и не знает
+    общего числа постов, поэтому COUNT(*) для неё не выполняется.
+    Пустая курсорная страница ссылается на соседей ключом `key`,
+    по которому она получена.
+    """
+
+    def __init__(self, object_list, number, paginator,
+                 has_next=None, has_previous=None, key=None):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.key = key
+
+    def __repr__(self):
+        if self.is_cursor:
+            return "<Cursor page>"
+        return super().__repr__()
+
+    @property
+    def is_cursor(self):
+        return self.number is None
+
+    def has_next(self):
+        if self.is_cursor:
+            return self._has_next
+        return super().has_next()
+
+    def has_previous(self):
+        if self.is_cursor:
+            return self._has_previous
+        return super().has_previous()
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def page_window(self):
+        """Номера страниц вокруг текущей, пропуски заменены на ELLIPSIS."""
+        if self.is_cursor:
+            return []
+        return list(self.paginator.get_elided_page_range(self.number))
+
+    def edge_cursor(self, index):
+        """Курсор крайнего поста страницы, у пустой страницы - её ключ."""
+        if not self.paginator.use_cursors:
+            return None
+        if self.object_list:
+            return encode_cursor(self.object_list[index])
+        if self.key is not None:
+            return encode_key(*self.key)
+        return None
+
+    @property
+    def next_cursor(self):
+        return self.edge_cursor(-1)
+
+    @property
+    def previous_cursor(self):
+        return self.edge_cursor(0)
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор ленты постов по ключу (pub_date, id).
+
+    Переход по курсору стоит одинаково для первой и для тысячной
+    страницы: выборка идёт по индексу от ключа, без OFFSET и COUNT(*).
+    Число постов для нумерованных страниц можно передать в `count`,
+    например из `posts.counters`, тогда COUNT(*) не выполняется вовсе.
+    Иначе с `count_limit` посты считаются не дальше этой границы:
+    для огромных выборок число страниц становится оценкой снизу,
+    зато подсчёт стоит одинаково при любом размере таблицы.
+
+    Выборки, упорядоченные не по дате (например, результаты поиска),
+    передаются с `use_cursors=False` и листаются только по номерам.
+    Такая выборка может сама считать посты до границы в `capped_count`.
+    Ленты, которые дорого считать, передаются с `numbered=False`
+    и листаются только курсорами, начиная с первой страницы.
+    Ленту из нескольких источников выборка читает от курсора
+    в `cursor_slice`.
+    """
+
+    ELLIPSIS = "…"
+
+    def __init__(self, object_list, per_page, count=None, count_limit=None,
+                 use_cursors=True, numbered=True, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_limit = count_limit
+        self.count_is_estimate = False
+        self.use_cursors = use_cursors
+        self.numbered = numbered
+        if count is not None:
+            self.count = count
+
+    @cached_property
+    def count(self):
+        if self.count_limit is None:
+            return super().count
+        if hasattr(self.object_list, "capped_count"):
+            count = self.object_list.capped_count(self.count_limit)
+        else:
+            count = (
+                self.object_list
+                .order_by()
+                .values("pk")[:self.count_limit]
+                .count())
+        self.count_is_estimate = count >= self.count_limit
+        return count
+
+    def get_elided_page_range(self, number=1, on_each_side=2, on_ends=1):
+        """Окно номеров страниц, как в Django 3.2.
+
+        Возвращает не больше 2 * (on_each_side + on_ends) + 3 элементов
+        при любом числе страниц.
+        """
+        number = self.validate_number(number)
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+
+        if number > on_each_side + on_ends + 2:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+
+        if number < num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+    def _get_page(self, *args, **kwargs):
+        return CursorPage(*args, **kwargs)
+
+    def page(self, number):
+        page = super().page(number)
+        # Ссылки на соседей строятся из постов страницы,
+        # поэтому срез QuerySet нужно вычислить один раз.
+        page.object_list = list(page.object_list)
+        return page
+
+    def cursor_queryset(self, key, backwards=False):
+        """Запрос следующих за ключом постов, плюс один для has_next."""
+        pub_date, pk = key
+        # Граница по pub_date вынесена отдельным условием: так SQLite
+        # начинает чтение индекса сразу с ключа, а не с начала ленты.
+        if backwards:
+            condition = Q(pub_date__gte=pub_date) & ~Q(
+                pub_date=pub_date, pk__lte=pk)
+            ordering = ("pub_date", "pk")
+        else:
+            condition = Q(pub_date__lte=pub_date) & ~Q(
+                pub_date=pub_date, pk__gte=pk)
+            ordering = ("-pub_date", "-pk")
+        return (
+            self.object_list
+            .filter(condition)
+            .order_by(*ordering)[:self.per_page + 1])
+
+    def cursor_page(self, after=None, before=None):
+        """Возвращает страницу после или перед постом из курсора.
+
+        Если курсор не удалось разобрать, возвращается первая страница,
+        как это делает `get_page` для неверного номера. Без нумерации
+        первая страница тоже читается как курсорная, без подсчёта.
+        """
+        token, backwards = (before, True) if before else (after, False)
+        key = decode_cursor(token) if token else None
+        if key is None:
+            if self.numbered:
+                return self.get_page(1)
+            backwards = False
+
+        if hasattr(self.object_list, "cursor_slice"):
+            posts = self.object_list.cursor_slice(
+                key, backwards, self.per_page + 1)
+        elif key is None:
+            posts = list(self.object_list[:self.per_page + 1])
+        else:
+            posts = list(self.cursor_queryset(key, backwards))
+        has_more = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+
+        if backwards:
+            posts.reverse()
+            return CursorPage(
+                posts, None, self,
+                has_next=True, has_previous=has_more, key=key)
+        return CursorPage(
+            posts, None, self,
+            has_next=has_more, has_previous=key is not None, key=key)
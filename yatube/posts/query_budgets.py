@@ -0,0 +1,27 @@
+# Наибольшее число запросов к базе на страницу, по имени адреса.
+# Считается для вошедшего пользователя при пустом кеше, вместе с чтением
+# сессии и пользователя. Число не должно зависеть от числа постов
+# на странице, это проверяет posts/tests/test_query_budgets.py.
+QUERY_BUDGETS = {
+    "posts:index": 5,
+    "posts:group_list": 6,
+    "posts:profile": 7,
+    "posts:post_detail": 4,
+    "posts:search": 5,
+    "posts:follow_index": 8,
+    "posts:profile_export": 3,
+    "posts:post_create": 3,
+    "posts:post_edit": 4,
+    "posts:api_index": 5,
+    "posts:api_group_list": 6,
+    "posts:api_profile": 6,
+    "posts:api_post_detail": 3,
+    "posts:index_rss": 1,
+    "posts:index_atom": 1,
+    "posts:group_rss": 2,
+    "posts:group_atom": 2,
+    "posts:profile_rss": 2,
+    "posts:profile_atom": 2,
+    "posts:nav_fragment": 2,
+    "posts:profile_fragment": 3,
+}
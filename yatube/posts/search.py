@@ -0,0 +1,122 @@
+import re
+
+from django.db import connection
+
+from .models import Post
+
+FTS_TABLE = "posts_post_fts"
+CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "text, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+WORD = re.compile(r"\w+")
+
+
+def fts_available():
+    return connection.vendor == "sqlite"
+
+
+def match_expression(query):
+    """Запрос FTS5: все слова запроса, каждое как префикс."""
+    words = WORD.findall(query.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def index_post(post):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)",
+            [post.pk, post.text])
+
+
+def index_posts_after(post_id):
+    """Индексирует посты с id больше post_id, вставленные без сигналов.
+
+    Посты, которые успели проиндексировать сигналы, пропускаются.
+    """
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, text) "
+            f"SELECT id, text FROM {Post._meta.db_table} WHERE id > %s "
+            f"AND id NOT IN (SELECT rowid FROM {FTS_TABLE} WHERE rowid > %s)",
+            [post_id, post_id])
+
+
+def unindex_post(post_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id])
+
+
+def rebuild_index():
+    """Заново индексирует все посты, возвращает их число."""
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_FTS_TABLE)
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, text) "
+            f"SELECT id, text FROM {Post._meta.db_table}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return Post.objects.count()
+
+
+def matching_ids_sql(query):
+    """Подзапрос с id найденных постов, для фильтров вида pk__in."""
+    return (
+        f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+        [match_expression(query)],
+    )
+
+
+class SearchResults:
+    """Найденные посты по убыванию релевантности.
+
+    Ведёт себя как последовательность для `Paginator`: срез читает
+    из индекса только id нужной страницы и одним запросом достаёт посты.
+    """
+
+    def __init__(self, query):
+        self.expression = match_expression(query)
+
+    def __len__(self):
+        return self.count()
+
+    def count(self):
+        return self.capped_count(None)
+
+    def capped_count(self, limit):
+        if not self.expression:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s LIMIT %s)",
+                [self.expression, -1 if limit is None else limit])
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        if not self.expression:
+            return []
+        start = key.start or 0
+        limit = -1 if key.stop is None else key.stop - start
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY rank LIMIT %s OFFSET %s",
+                [self.expression, limit, start])
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = Post.objects.index_feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query):
+    return SearchResults(query)
@@ -0,0 +1,146 @@
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max
+from faker import Faker
+
+from . import counters, search, versions
+from .importer import insert_sql
+from .models import Group, User, make_excerpt
+
+SENTENCE_POOL_SIZE = 2000
+# Даты постов не зависят от дня запуска, чтобы замеры повторялись.
+DEFAULT_END = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def zipf_cum_weights(size, exponent):
+    """Накопленные веса закона Ципфа: у k-го по популярности 1 / k^s."""
+    ranks = range(1, size + 1)
+    return list(accumulate(1 / rank ** exponent for rank in ranks))
+
+
+def new_ids(model, last_id):
+    return list(
+        model.objects
+        .filter(pk__gt=last_id or 0)
+        .order_by("pk")
+        .values_list("pk", flat=True))
+
+
+def last_id(model):
+    return model.objects.aggregate(last_id=Max("pk"))["last_id"]
+
+
+class Seeder:
+    """Генерирует пользователей, группы и посты для нагрузочных тестов.
+
+    Все случайные значения берутся из генераторов, заведённых от seed,
+    поэтому один и тот же seed на пустой базе даёт те же данные.
+    Посты распределены по авторам и группам по закону Ципфа:
+    немногие популярные авторы пишут большую часть постов.
+    """
+
+    def __init__(self, seed, prefix="seed", exponent=1.1,
+                 batch_size=10000):
+        self.random = random.Random(seed)
+        self.faker = Faker("ru_RU")
+        self.faker.seed_instance(seed)
+        self.prefix = prefix
+        self.exponent = exponent
+        self.batch_size = batch_size
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield start, min(self.batch_size, total - start)
+
+    def create_users(self, count, password=None):
+        password = make_password(password)
+        before = last_id(User)
+        for start, size in self.batches(count):
+            users = []
+            for number in range(start, start + size):
+                if self.random.random() < 0.5:
+                    first_name = self.faker.first_name_male()
+                    last_name = self.faker.last_name_male()
+                else:
+                    first_name = self.faker.first_name_female()
+                    last_name = self.faker.last_name_female()
+                users.append(User(
+                    username=f"{self.prefix}{number}",
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=password,
+                ))
+            User.objects.bulk_create(users)
+        return new_ids(User, before)
+
+    def create_groups(self, count):
+        before = last_id(Group)
+        for start, size in self.batches(count):
+            Group.objects.bulk_create(
+                Group(
+                    title=self.faker.sentence(nb_words=3).rstrip("."),
+                    slug=f"{self.prefix}-group-{number}",
+                    description=self.faker.paragraph(),
+                )
+                for number in range(start, start + size)
+            )
+        return new_ids(Group, before)
+
+    def post_rows(self, count, author_ids, group_ids, ungrouped, start, end):
+        """Строки постов пачками в порядке POST_FIELDS импорта.
+
+        Даты растут вместе с id.
+        """
+        sentences = [
+            self.faker.sentence() for _ in range(SENTENCE_POOL_SIZE)]
+        # Самые популярные авторы и группы - случайные, а не первые.
+        author_ids = self.random.sample(author_ids, len(author_ids))
+        group_ids = self.random.sample(group_ids, len(group_ids))
+        author_weights = zipf_cum_weights(len(author_ids), self.exponent)
+        group_weights = zipf_cum_weights(len(group_ids), self.exponent)
+        mean_gap = (end - start).total_seconds() / max(count, 1)
+        adapt = connection.ops.adapt_datetimefield_value
+        moment = start
+
+        for _, size in self.batches(count):
+            authors = self.random.choices(
+                author_ids, cum_weights=author_weights, k=size)
+            groups = [None] * size
+            if group_ids:
+                groups = self.random.choices(
+                    group_ids, cum_weights=group_weights, k=size)
+            rows = []
+            for author_id, group_id in zip(authors, groups):
+                if self.random.random() < ungrouped:
+                    group_id = None
+                moment += timedelta(
+                    seconds=self.random.expovariate(1 / mean_gap))
+                text = " ".join(self.random.choices(
+                    sentences, k=self.random.randint(1, 6)))
+                pub_date = adapt(min(moment, end))
+                excerpt = make_excerpt(text)
+                rows.append((
+                    text, excerpt, excerpt != text, pub_date, pub_date,
+                    author_id, group_id))
+            yield rows
+
+    def create_posts(self, count, author_ids, group_ids, ungrouped,
+                     start, end):
+        """Вставляет посты через executemany, без создания моделей."""
+        sql = insert_sql()
+        rows = self.post_rows(
+            count, author_ids, group_ids, ungrouped, start, end)
+        for batch in rows:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, batch)
+
+    def finish(self):
+        """Пересчитывает то, что при обычной записи делают сигналы."""
+        counters.recount()
+        if search.fts_available():
+            search.rebuild_index()
+        versions.bump(versions.SITE)
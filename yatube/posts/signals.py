@@ -0,0 +1,183 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import counters, follow, search, versions
+from .cards import forget_cards
+from .models import Follow, Group, Post
+
+User = get_user_model()
+
+# Поля автора и группы, которые видны в карточке поста.
+AUTHOR_CARD_FIELDS = ("username", "first_name", "last_name")
+GROUP_CARD_FIELDS = ("slug",)
+# Поля группы, которые видны не только на её странице: название
+# выводится на страницах постов и в категориях лент RSS и Atom.
+GROUP_PAGE_FIELDS = (*GROUP_CARD_FIELDS, "title")
+
+
+def changed_fields(instance, fields, update_fields):
+    """Поля из fields, которые изменит сохранение instance."""
+    if instance._state.adding:
+        return set()
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    if not fields:
+        return set()
+    saved = (
+        type(instance)._default_manager
+        .filter(pk=instance.pk)
+        .values(*fields)
+        .first())
+    if saved is None:
+        return set()
+    return {
+        field for field in fields if saved[field] != getattr(instance, field)}
+
+
+def fields_changed(instance, fields, update_fields):
+    """Изменит ли сохранение instance какое-то из полей fields."""
+    return bool(changed_fields(instance, fields, update_fields))
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_scope(sender, instance, raw, **kwargs):
+    """Запоминает автора и группу поста до редактирования."""
+    instance._saved_scope = None
+    instance._saved_feed_scopes = []
+    if raw or instance._state.adding:
+        return
+    saved = (
+        Post.objects
+        .filter(pk=instance.pk)
+        .values("author_id", "group_id", "author__username", "group__slug")
+        .first())
+    if saved is None:
+        return
+    instance._saved_scope = (saved["author_id"], saved["group_id"])
+    instance._saved_feed_scopes = versions.feed_scopes(
+        saved["author__username"], saved["group__slug"])
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw, **kwargs):
+    new_keys = counters.post_keys(instance.author_id, instance.group_id)
+    if created:
+        counters.change(new_keys, 1)
+        return
+    saved_scope = getattr(instance, "_saved_scope", None)
+    if saved_scope is None:
+        return
+    old_keys = counters.post_keys(*saved_scope)
+    counters.change(set(old_keys) - set(new_keys), -1)
+    counters.change(set(new_keys) - set(old_keys), 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.change(
+        counters.post_keys(instance.author_id, instance.group_id), -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def forget_post_card(sender, instance, **kwargs):
+    forget_cards([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_versions(sender, instance, **kwargs):
+    """Устаревают только ленты, в которые пост входил или вошёл."""
+    group_slug = instance.group.slug if instance.group_id else None
+    versions.bump(
+        versions.post_key(instance.pk),
+        *versions.feed_scopes(instance.author.username, group_slug),
+        *getattr(instance, "_saved_feed_scopes", []))
+
+
+@receiver(post_save, sender=Post)
+def deliver_new_post(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        follow.schedule_delivery(instance)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follower(sender, instance, created, raw, **kwargs):
+    if not created or raw:
+        return
+    counters.change([counters.followers_key(instance.author_id)], 1)
+    follow.backfill(instance.user, instance.author)
+
+
+@receiver(post_delete, sender=Follow)
+def count_lost_follower(sender, instance, **kwargs):
+    counters.change([counters.followers_key(instance.author_id)], -1)
+    follow.forget_author(instance.user, instance.author)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, **kwargs):
+    search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    search.unindex_post(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def remember_author_card_change(sender, instance, raw, update_fields,
+                                **kwargs):
+    instance._card_changed = not raw and fields_changed(
+        instance, AUTHOR_CARD_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=User)
+def forget_author_cards(sender, instance, **kwargs):
+    if getattr(instance, "_card_changed", False):
+        forget_cards(
+            Post.objects.filter(author=instance).values_list("pk", flat=True))
+        versions.bump(versions.SITE)
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_card_change(sender, instance, raw, update_fields,
+                               **kwargs):
+    changed = set() if raw else changed_fields(
+        instance, GROUP_PAGE_FIELDS, update_fields)
+    instance._card_changed = bool(changed & set(GROUP_CARD_FIELDS))
+    instance._pages_changed = bool(changed)
+
+
+@receiver(post_save, sender=Group)
+def forget_group_cards(sender, instance, created, **kwargs):
+    if getattr(instance, "_card_changed", False):
+        forget_cards(
+            Post.objects.filter(group=instance).values_list("pk", flat=True))
+    if getattr(instance, "_pages_changed", False):
+        versions.bump(versions.SITE)
+    elif not created:
+        versions.bump(versions.group_scope(instance.slug))
+
+
+@receiver(pre_delete, sender=Group)
+def forget_deleted_group_cards(sender, instance, **kwargs):
+    # SET_NULL обновит посты без сигналов, ссылки на группу в карточках
+    # нужно сбросить, пока посты ещё в ней.
+    forget_cards(
+        Post.objects.filter(group=instance).values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def forget_group_counter(sender, instance, **kwargs):
+    # Посты удалённой группы остаются, но по SET_NULL уже без группы.
+    counters.forget(counters.group_key(instance.pk))
+    versions.bump(versions.SITE)
+
+
+@receiver(post_delete, sender=User)
+def forget_author_counter(sender, instance, **kwargs):
+    counters.forget(counters.author_key(instance.pk))
+    versions.bump(versions.SITE)
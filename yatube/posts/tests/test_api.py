@@ -0,0 +1,146 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="title",
+            slug="slug",
+            description="description",
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group if number % 2 else None,
+                text=f"текст {number}",
+            )
+            for number in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def get_json(self, path, **query):
+        response = self.client.get(path, query)
+        content = b"".join(response.streaming_content)
+        return response, json.loads(content)
+
+    def ids(self, data):
+        return [row["id"] for row in data["results"]]
+
+    def test_feeds_list_lean_rows(self):
+        posts = list(reversed(PostApiTests.posts))
+        newest = [post.id for post in posts]
+        feeds = {
+            reverse("posts:api_index"): newest,
+            reverse("posts:api_group_list", kwargs={"slug": "slug"}): [
+                post.id for post in posts if post.group_id],
+            reverse("posts:api_profile", kwargs={"username": "author"}):
+                newest,
+        }
+        for path, expected in feeds.items():
+            with self.subTest(path=path):
+                response, data = self.get_json(path)
+                self.assertEqual(response["Content-Type"], "application/json")
+                self.assertEqual(self.ids(data), expected)
+                self.assertIsNone(data["next"])
+                self.assertIsNone(data["previous"])
+
+        row = data["results"][0]
+        self.assertEqual(set(row), {
+            "id", "text", "pub_date", "edit_date", "username", "group_slug"})
+        self.assertEqual(row["username"], "author")
+
+    def test_cursor_paging(self):
+        path = reverse("posts:api_index")
+        newest = [post.id for post in reversed(PostApiTests.posts)]
+
+        _, first = self.get_json(path, limit=2)
+        _, second = self.get_json(path, limit=2, after=first["next"])
+        _, last = self.get_json(path, limit=2, after=second["next"])
+        _, back = self.get_json(path, limit=2, before=second["previous"])
+
+        self.assertEqual(self.ids(first), newest[:2])
+        self.assertEqual(self.ids(second), newest[2:4])
+        self.assertEqual(self.ids(last), newest[4:])
+        self.assertIsNone(last["next"])
+        self.assertEqual(self.ids(back), newest[:2])
+        self.assertIsNone(back["previous"])
+
+    def test_cursor_page_queries(self):
+        path = reverse("posts:api_index")
+        _, first = self.get_json(path, limit=2)
+        # Счётчик из кеша, время изменения и сама страница.
+        with self.assertNumQueries(2):
+            self.get_json(path, limit=2, after=first["next"])
+
+    def test_bad_parameters(self):
+        path = reverse("posts:api_index")
+        for query in [{"limit": "x"}, {"limit": 0}, {"limit": 1000},
+                      {"after": "garbage"}]:
+            with self.subTest(query=query):
+                response = self.client.get(path, query)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+    def test_missing_objects(self):
+        paths = [
+            reverse("posts:api_group_list", kwargs={"slug": "missing"}),
+            reverse("posts:api_profile", kwargs={"username": "missing"}),
+            reverse("posts:api_post_detail", kwargs={"post_id": 10 ** 6}),
+        ]
+        for path in paths:
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+    def test_post_detail(self):
+        post = PostApiTests.posts[1]
+        response = self.client.get(
+            reverse("posts:api_post_detail", kwargs={"post_id": post.id}))
+
+        data = response.json()
+        self.assertEqual(data["text"], post.text)
+        self.assertEqual(data["group_slug"], "slug")
+
+    def test_validators_answer_polls_with_304(self):
+        paths = [
+            reverse("posts:api_index"),
+            reverse(
+                "posts:api_post_detail",
+                kwargs={"post_id": PostApiTests.posts[0].id}),
+        ]
+        for path in paths:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                etag = response["ETag"]
+
+                repeated = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+
+                self.assertEqual(repeated.status_code, 304)
+
+    def test_new_post_changes_feed_etag(self):
+        path = reverse("posts:api_index")
+        etag = self.client.get(path)["ETag"]
+
+        Post.objects.create(author=PostApiTests.user, text="new")
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_write_methods_are_not_allowed(self):
+        response = self.client.post(reverse("posts:api_index"))
+
+        self.assertEqual(response.status_code, 405)
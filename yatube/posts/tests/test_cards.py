@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..cards import card_key
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username="author", first_name="Лев", last_name="Толстой")
+        cls.group = Group.objects.create(
+            title="title",
+            slug="slug",
+            description="description",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=PostCardCacheTests.user,
+            group=PostCardCacheTests.group,
+            text="text",
+        )
+        self.client = Client()
+
+    def test_card_is_cached_after_first_render(self):
+        self.client.get(reverse("posts:index"))
+
+        self.assertIsNotNone(cache.get(card_key("index", self.post.id)))
+
+    def test_cached_card_is_served(self):
+        cache.set(
+            card_key("index", self.post.id),
+            (self.post.edit_date.isoformat(), "cached card"),
+        )
+
+        response = self.client.get(reverse("posts:index"))
+
+        self.assertContains(response, "cached card")
+
+    def test_edit_refreshes_card(self):
+        self.client.get(reverse("posts:index"))
+        author_client = Client()
+        author_client.force_login(PostCardCacheTests.user)
+
+        author_client.post(
+            reverse("posts:post_edit", kwargs={"post_id": self.post.id}),
+            data={"text": "edited text", "group": ""},
+        )
+
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, "edited text")
+        self.assertNotContains(response, "все записи группы")
+
+    def test_author_rename_refreshes_card(self):
+        self.client.get(reverse("posts:index"))
+        user = User.objects.get(id=PostCardCacheTests.user.id)
+        user.first_name = "Алексей"
+        user.save()
+
+        response = self.client.get(reverse("posts:index"))
+
+        self.assertContains(response, "Алексей Толстой")
+
+    def test_group_slug_change_refreshes_card(self):
+        self.client.get(reverse("posts:index"))
+        group = Group.objects.get(id=PostCardCacheTests.group.id)
+        group.slug = "new_slug"
+        group.save()
+
+        response = self.client.get(reverse("posts:index"))
+
+        self.assertContains(
+            response,
+            reverse("posts:group_list", kwargs={"slug": "new_slug"}),
+        )
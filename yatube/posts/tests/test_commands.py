@@ -0,0 +1,21 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..management.commands.check_query_plans import plan_problems
+from ..models import Post
+
+
+class CheckQueryPlansCommandTests(TestCase):
+    def test_feed_queries_use_indexes(self):
+        out = StringIO()
+
+        call_command("check_query_plans", stdout=out)
+
+        self.assertIn("profile: after", out.getvalue())
+
+    def test_unindexed_sort_is_reported(self):
+        plan = Post.objects.order_by("text").explain()
+
+        self.assertTrue(plan_problems(plan))
@@ -0,0 +1,180 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import counters
+from ..models import Group, Post, PostCounter
+
+User = get_user_model()
+
+
+class PostCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="title",
+            slug="slug",
+            description="description",
+        )
+        cls.other_group = Group.objects.create(
+            title="other title",
+            slug="other_slug",
+            description="other description",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=PostCounterTests.user,
+            group=PostCounterTests.group,
+            text="text",
+        )
+
+    def test_create_counts_post_everywhere(self):
+        self.assertCounts(posts=1, author=1, group=1, other_group=0)
+
+    def test_edit_moves_post_between_groups(self):
+        self.post.group = PostCounterTests.other_group
+        self.post.save()
+
+        self.assertCounts(posts=1, author=1, group=0, other_group=1)
+
+    def test_edit_through_view_keeps_counts(self):
+        client = Client()
+        client.force_login(PostCounterTests.user)
+
+        client.post(
+            reverse("posts:post_edit", kwargs={"post_id": self.post.id}),
+            data={"text": "new text", "group": ""},
+        )
+
+        self.assertCounts(posts=1, author=1, group=0, other_group=0)
+
+    def test_delete_uncounts_post(self):
+        self.post.delete()
+
+        self.assertCounts(posts=0, author=0, group=0, other_group=0)
+
+    def test_group_delete_drops_group_counter(self):
+        group_id = PostCounterTests.group.id
+        Group.objects.get(id=group_id).delete()
+
+        self.assertFalse(
+            PostCounter.objects.filter(
+                key=counters.group_key(group_id)).exists())
+        self.assertCounts(posts=1, author=1, group=0, other_group=0)
+
+    def test_count_is_cached_until_post_changes(self):
+        key = counters.author_key(PostCounterTests.user.id)
+        counters.get_count(key)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.get_count(key), 1)
+
+        Post.objects.create(author=PostCounterTests.user, text="text")
+        self.assertEqual(counters.get_count(key), 2)
+
+    def test_recount_posts_fixes_drift(self):
+        PostCounter.objects.filter(key=counters.ALL_POSTS).update(count=42)
+        out = StringIO()
+
+        call_command("recount_posts", stdout=out)
+
+        self.assertIn("1", out.getvalue())
+        self.assertCounts(posts=1, author=1, group=1, other_group=0)
+
+    def test_recount_groups_posts_of_one_author(self):
+        Post.objects.create(
+            author=PostCounterTests.user,
+            group=PostCounterTests.group,
+            text="second",
+        )
+
+        self.assertEqual(counters.recount(), 0)
+        self.assertCounts(posts=2, author=2, group=2, other_group=0)
+
+    def assertCounts(self, posts, author, group, other_group):
+        expected = {
+            counters.ALL_POSTS: posts,
+            counters.author_key(PostCounterTests.user.id): author,
+            counters.group_key(PostCounterTests.group.id): group,
+            counters.group_key(PostCounterTests.other_group.id): other_group,
+        }
+        for key, count in expected.items():
+            with self.subTest(key=key):
+                self.assertEqual(counters.get_count(key), count)
+
+
+class CounterBackfillTests(TestCase):
+    """Пересчёт по таблице постов, у авторов и групп по нескольку постов.
+
+    Посты опубликованы в разное время: поля сортировки Post.Meta.ordering
+    в GROUP BY дали бы по строке на пост вместо строки на автора.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = [
+            User.objects.create_user(username=f"author{number}")
+            for number in range(2)
+        ]
+        groups = [
+            Group.objects.create(
+                title=f"title {number}",
+                slug=f"slug{number}",
+                description="description",
+            )
+            for number in range(2)
+        ]
+        now = timezone.now()
+        for number in range(7):
+            post = Post.objects.create(
+                author=authors[number % 2],
+                group=groups[number % 2] if number % 3 else None,
+                text=str(number),
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(days=number))
+        cls.expected = {
+            counters.ALL_POSTS: 7,
+            counters.author_key(authors[0].id): 4,
+            counters.author_key(authors[1].id): 3,
+            counters.group_key(groups[0].id): 2,
+            counters.group_key(groups[1].id): 2,
+        }
+
+    def stored_counts(self):
+        return {
+            key: count
+            for key, count in PostCounter.objects.values_list("key", "count")
+            if key in CounterBackfillTests.expected
+        }
+
+    def test_actual_counts_group_by_author_and_group(self):
+        counts = counters.actual_counts()
+
+        for key, count in CounterBackfillTests.expected.items():
+            with self.subTest(key=key):
+                self.assertEqual(counts[key], count)
+
+    def test_recount_keeps_signal_counts(self):
+        self.assertEqual(counters.recount(), 0)
+        self.assertEqual(self.stored_counts(), CounterBackfillTests.expected)
+
+    def test_migration_backfill(self):
+        migration = import_module("posts.migrations.0005_postcounter")
+        PostCounter.objects.all().delete()
+
+        migration.fill_counters(apps, None)
+
+        self.assertEqual(self.stored_counts(), CounterBackfillTests.expected)
@@ -0,0 +1,122 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ExportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.other_user = User.objects.create_user(username="other")
+        cls.group = Group.objects.create(
+            title="title",
+            slug="slug",
+            description="description",
+        )
+        cls.old_post = Post.objects.create(
+            author=cls.user, group=cls.group, text="старый пост")
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=datetime(2015, 1, 1, tzinfo=timezone.utc))
+        cls.new_post = Post.objects.create(
+            author=cls.user, text="новый пост")
+        cls.other_post = Post.objects.create(
+            author=cls.other_user, group=cls.group, text="чужой пост")
+
+    def setUp(self):
+        cache.clear()
+
+    def export(self, *args):
+        out = StringIO()
+        call_command("export_posts", *args, stdout=out)
+        return out.getvalue()
+
+    def texts(self, output):
+        return [json.loads(line)["text"] for line in output.splitlines()]
+
+    def test_export_jsonl_in_publication_order(self):
+        output = self.export()
+
+        self.assertEqual(
+            self.texts(output), ["старый пост", "новый пост", "чужой пост"])
+        first = json.loads(output.splitlines()[0])
+        self.assertEqual(first["author"], "author")
+        self.assertEqual(first["group"], "slug")
+        self.assertEqual(first["pub_date"], "2015-01-01T00:00:00+00:00")
+
+    def test_filters(self):
+        cases = {
+            ("--author", "author"): ["старый пост", "новый пост"],
+            ("--group", "slug"): ["старый пост", "чужой пост"],
+            ("--since", "2016-01-01"): ["новый пост", "чужой пост"],
+            ("--until", "2016-01-01"): ["старый пост"],
+        }
+        for args, texts in cases.items():
+            with self.subTest(args=args):
+                self.assertEqual(self.texts(self.export(*args)), texts)
+
+    def test_unknown_filter_values(self):
+        for args in [("--author", "missing"), ("--group", "missing"),
+                     ("--since", "yesterday")]:
+            with self.subTest(args=args):
+                with self.assertRaises(CommandError):
+                    self.export(*args)
+
+    def test_export_imports_back(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "posts.csv")
+
+        self.export("--format", "csv", "--output", path, "--chunk-size", "1")
+        Post.objects.all().delete()
+        call_command("import_posts", path, stdout=StringIO())
+
+        self.assertEqual(
+            list(Post.objects.values_list("text", "pub_date")),
+            [
+                ("чужой пост", ExportPostsTests.other_post.pub_date),
+                ("новый пост", ExportPostsTests.new_post.pub_date),
+                ("старый пост",
+                 datetime(2015, 1, 1, tzinfo=timezone.utc)),
+            ],
+        )
+
+    def test_author_downloads_own_posts(self):
+        client = Client()
+        client.force_login(ExportPostsTests.user)
+        path = reverse("posts:profile_export", kwargs={"username": "author"})
+
+        response = client.get(path, {"format": "csv"})
+
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(
+            [row["text"] for row in rows], ["старый пост", "новый пост"])
+
+    def test_other_users_cannot_download(self):
+        path = reverse("posts:profile_export", kwargs={"username": "author"})
+        client = Client()
+        client.force_login(ExportPostsTests.other_user)
+
+        response = client.get(path)
+
+        self.assertRedirects(
+            response,
+            reverse("posts:profile", kwargs={"username": "author"}))
+        self.assertEqual(Client().get(path).status_code, 302)
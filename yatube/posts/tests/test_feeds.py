@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="title",
+            slug="slug",
+            description="description",
+        )
+        cls.other_group = Group.objects.create(
+            title="other title",
+            slug="other_slug",
+            description="other description",
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text="first post",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def feed_paths(self):
+        return {
+            "index_rss": reverse("posts:index_rss"),
+            "index_atom": reverse("posts:index_atom"),
+            "group_rss": reverse("posts:group_rss", kwargs={"slug": "slug"}),
+            "group_atom": reverse(
+                "posts:group_atom", kwargs={"slug": "slug"}),
+            "profile_rss": reverse(
+                "posts:profile_rss", kwargs={"username": "author"}),
+            "profile_atom": reverse(
+                "posts:profile_atom", kwargs={"username": "author"}),
+        }
+
+    def test_feeds_list_posts(self):
+        for name, path in self.feed_paths().items():
+            with self.subTest(name=name):
+                response = self.client.get(path)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(b"first post", response.content)
+                self.assertIn("Last-Modified", response)
+                self.assertIn("ETag", response)
+        self.assertIn("atom", response["Content-Type"])
+
+    def test_feeds_carry_full_text(self):
+        text = "слово " * Post.EXCERPT_LEN + "конец"
+        Post.objects.create(
+            author=PostFeedTests.user, group=PostFeedTests.group, text=text)
+        for name, path in self.feed_paths().items():
+            with self.subTest(name=name):
+                self.assertIn(
+                    "конец".encode(), self.client.get(path).content)
+
+    def test_missing_scope_is_404(self):
+        for path in [
+            reverse("posts:group_rss", kwargs={"slug": "missing"}),
+            reverse("posts:profile_atom", kwargs={"username": "missing"}),
+        ]:
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+    def test_unchanged_poll_skips_database(self):
+        auth_client = Client()
+        auth_client.force_login(PostFeedTests.user)
+        for name, path in self.feed_paths().items():
+            with self.subTest(name=name):
+                response = self.client.get(path)
+                with self.assertNumQueries(0):
+                    repeated = auth_client.get(
+                        path, HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(repeated.status_code, 304)
+                with self.assertNumQueries(0):
+                    repeated = self.client.get(
+                        path,
+                        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+                self.assertEqual(repeated.status_code, 304)
+
+    def test_new_post_refreshes_only_its_feeds(self):
+        paths = self.feed_paths()
+        other_path = reverse(
+            "posts:group_rss", kwargs={"slug": "other_slug"})
+        for path in [*paths.values(), other_path]:
+            self.client.get(path)
+
+        Post.objects.create(
+            author=PostFeedTests.user,
+            group=PostFeedTests.group,
+            text="second post",
+        )
+
+        for name, path in paths.items():
+            with self.subTest(name=name):
+                self.assertIn(b"second post", self.client.get(path).content)
+        with self.assertNumQueries(0):
+            self.client.get(other_path)
+
+    def test_pages_link_their_feeds(self):
+        paths = self.feed_paths()
+        pages = {
+            reverse("posts:index"): paths["index_atom"],
+            reverse("posts:group_list", kwargs={"slug": "slug"}):
+                paths["group_atom"],
+            reverse("posts:profile", kwargs={"username": "author"}):
+                paths["profile_rss"],
+        }
+        for page, feed_path in pages.items():
+            with self.subTest(page=page):
+                self.assertContains(self.client.get(page), feed_path)
@@ -0,0 +1,161 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import counters
+from ..follow import FollowFeed
+from ..models import FeedItem, Follow, Post
+from ..paginator import encode_cursor
+from ..views import POSTS_PER_PAGE
+
+User = get_user_model()
+
+
+@override_settings(POSTS_FANOUT_ASYNC=False)
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.stranger = User.objects.create_user(username="stranger")
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(FollowTests.reader)
+
+    def follow(self, username="author"):
+        return self.client.get(
+            reverse("posts:profile_follow", kwargs={"username": username}))
+
+    def feed_posts(self, **query):
+        response = self.client.get(reverse("posts:follow_index"), query)
+        return response.context["page_obj"]
+
+    def test_follow_counts_follower_and_backfills(self):
+        post = Post.objects.create(author=FollowTests.author, text="old")
+
+        self.follow()
+
+        self.assertTrue(Follow.objects.filter(
+            user=FollowTests.reader, author=FollowTests.author).exists())
+        self.assertEqual(
+            counters.get_count(counters.followers_key(FollowTests.author.id)),
+            1,
+        )
+        self.assertEqual(list(self.feed_posts()), [post])
+
+    def test_cannot_follow_yourself(self):
+        self.follow("reader")
+
+        self.assertFalse(Follow.objects.exists())
+
+    def test_new_post_is_delivered_to_followers_only(self):
+        self.follow()
+        Follow.objects.create(
+            user=FollowTests.stranger, author=FollowTests.reader)
+
+        post = Post.objects.create(author=FollowTests.author, text="new")
+
+        self.assertTrue(FeedItem.objects.filter(
+            user=FollowTests.reader, post=post).exists())
+        self.assertFalse(FeedItem.objects.filter(
+            user=FollowTests.stranger).exists())
+        self.assertEqual(list(self.feed_posts()), [post])
+
+    def test_delivery_to_many_followers(self):
+        User.objects.bulk_create(
+            User(username=f"follower{number}") for number in range(600))
+        followers = User.objects.filter(username__startswith="follower")
+        Follow.objects.bulk_create(
+            Follow(user=follower, author=FollowTests.author)
+            for follower in followers)
+        counters.recount()
+
+        post = Post.objects.create(author=FollowTests.author, text="text")
+
+        self.assertEqual(FeedItem.objects.filter(post=post).count(), 600)
+
+    def test_unfollow_clears_feed(self):
+        self.follow()
+        Post.objects.create(author=FollowTests.author, text="text")
+
+        self.client.get(reverse(
+            "posts:profile_unfollow", kwargs={"username": "author"}))
+
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(FeedItem.objects.exists())
+        self.assertEqual(list(self.feed_posts()), [])
+
+    @override_settings(POSTS_FANOUT_MAX_FOLLOWERS=0)
+    def test_celebrity_posts_are_read_not_delivered(self):
+        self.follow()
+        post = Post.objects.create(author=FollowTests.author, text="text")
+
+        self.assertFalse(FeedItem.objects.exists())
+        self.assertEqual(list(self.feed_posts()), [post])
+
+    @override_settings(POSTS_FANOUT_MAX_FOLLOWERS=1)
+    def test_feed_merges_delivered_and_celebrity_posts(self):
+        self.follow()
+        self.follow("stranger")
+        Follow.objects.create(
+            user=FollowTests.author, author=FollowTests.stranger)
+        for number in range(POSTS_PER_PAGE + 3):
+            author = (FollowTests.author, FollowTests.stranger)[number % 2]
+            Post.objects.create(author=author, text=str(number))
+        expected = list(Post.objects.all())
+
+        first = self.feed_posts()
+        second = self.feed_posts(after=first.next_cursor)
+        back = self.feed_posts(before=second.previous_cursor)
+
+        self.assertFalse(FeedItem.objects.filter(
+            user=FollowTests.reader,
+            post__author=FollowTests.stranger).exists())
+        self.assertEqual(list(first) + list(second), expected)
+        self.assertFalse(second.has_next())
+        self.assertEqual(list(back), list(first))
+
+    def test_feed_is_paged_by_cursors_only(self):
+        self.follow()
+        for number in range(POSTS_PER_PAGE + 1):
+            Post.objects.create(author=FollowTests.author, text=str(number))
+
+        first = self.feed_posts(page=2)
+        second = self.feed_posts(after=first.next_cursor)
+
+        self.assertTrue(first.is_cursor)
+        self.assertEqual(first.page_window, [])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+        self.assertEqual(len(first), POSTS_PER_PAGE)
+        self.assertEqual(list(second), [Post.objects.last()])
+        self.assertTrue(second.has_previous())
+        self.assertFalse(second.has_next())
+
+    def test_empty_cursor_page_links_back(self):
+        self.follow()
+        post = Post.objects.create(author=FollowTests.author, text="text")
+        cursor = encode_cursor(post)
+
+        response = self.client.get(
+            reverse("posts:follow_index"), {"after": cursor})
+
+        self.assertEqual(len(response.context["page_obj"]), 0)
+        self.assertContains(response, f"?before={cursor}")
+
+    def test_celebrity_authors_are_read_once(self):
+        self.follow()
+        feed = FollowFeed(FollowTests.reader)
+        feed.cursor_slice(None, False, POSTS_PER_PAGE)
+
+        with self.assertNumQueries(0):
+            feed.celebrity_ids
+
+    def test_follow_page_requires_login(self):
+        response = Client().get(reverse("posts:follow_index"))
+
+        self.assertEqual(response.status_code, 302)
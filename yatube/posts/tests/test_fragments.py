@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, User
+
+
+class FragmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.post = Post.objects.create(text="Текст", author=cls.author)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(FragmentTests.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(FragmentTests.reader)
+
+    def test_shared_pages_link_fragments(self):
+        nav = reverse("posts:nav_fragment")
+        actions = reverse(
+            "posts:profile_fragment", kwargs={"username": "author"})
+
+        response = self.author_client.get(
+            reverse("posts:profile", kwargs={"username": "author"}))
+
+        self.assertContains(response, f'<template data-fragment="{nav}">')
+        self.assertContains(
+            response, f'<template data-fragment="{actions}">')
+        self.assertContains(response, "js/fragments.js")
+        self.assertNotContains(response, "Выйти")
+        self.assertNotContains(response, "Скачать мои посты")
+
+    @override_settings(FRAGMENTS_MODE="esi")
+    def test_esi_mode(self):
+        response = self.client.get(reverse("posts:index"))
+
+        self.assertContains(
+            response,
+            f'<esi:include src="{reverse("posts:nav_fragment")}"/>')
+
+    def test_private_pages_render_header_inline(self):
+        response = self.author_client.get(reverse("posts:follow_index"))
+
+        self.assertContains(response, "Пользователь: author")
+        self.assertNotContains(response, "data-fragment")
+
+    def test_nav_fragment(self):
+        path = reverse("posts:nav_fragment")
+
+        guest_response = self.client.get(path)
+        response = self.author_client.get(path)
+
+        self.assertContains(guest_response, "Войти")
+        self.assertContains(response, "Пользователь: author")
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("Cookie", response["Vary"])
+
+    def test_profile_fragment(self):
+        path = reverse("posts:profile_fragment", kwargs={"username": "author"})
+
+        self.assertNotContains(self.client.get(path), "href")
+        self.assertContains(
+            self.author_client.get(path), "Скачать мои посты")
+        self.assertContains(self.reader_client.get(path), "Отписаться")
+        Follow.objects.all().delete()
+        self.assertContains(self.reader_client.get(path), "Подписаться")
@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from .. import counters, importer
+from ..models import Group, ImportCheckpoint, Post
+from ..search import search_posts
+
+User = get_user_model()
+
+
+class ImportPostsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="title",
+            slug="slug",
+            description="description",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as source:
+            source.write(content)
+        return path
+
+    def write_jsonl(self, records):
+        return self.write(
+            "posts.jsonl",
+            "".join(json.dumps(record) + "\n" for record in records))
+
+    def import_posts(self, path, *args):
+        out = StringIO()
+        call_command("import_posts", path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_jsonl_import_keeps_dates_and_side_effects(self):
+        path = self.write_jsonl([
+            {"author": "author", "text": "архивный пост", "group": "slug",
+             "pub_date": "2015-03-01T10:00:00+00:00"},
+            {"author": "author", "text": "второй пост"},
+            {"author": "nobody", "text": "чужой пост"},
+            {"author": "author", "text": ""},
+        ])
+
+        output = self.import_posts(path, "--batch-size", "3")
+
+        self.assertIn("Импортировано постов: 2, пропущено записей: 2", output)
+        self.assertIn("записей/с", output)
+        post = Post.objects.get(text="архивный пост")
+        self.assertEqual(
+            post.pub_date, datetime(2015, 3, 1, 10, tzinfo=timezone.utc))
+        self.assertEqual(post.group, ImportPostsCommandTests.group)
+        self.assertGreater(post.edit_date, post.pub_date)
+        self.assertEqual(counters.get_count(counters.ALL_POSTS), 2)
+        self.assertEqual(counters.get_count(
+            counters.group_key(ImportPostsCommandTests.group.id)), 1)
+        self.assertEqual(counters.recount(), 0)
+        self.assertEqual(list(search_posts("архивн")[:10]), [post])
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_malformed_records_are_skipped(self):
+        path = self.write_jsonl([
+            {"author": "author", "text": "несуществующая дата",
+             "pub_date": "2020-02-30T10:00:00"},
+            {"author": ["author"], "text": "автор списком"},
+            {"author": "author", "text": "группа числом", "group": 1},
+            {"author": "author", "text": "дата числом", "pub_date": 2020},
+            {"author": "author", "text": {"text": "текст словарём"}},
+            {"author": "author", "text": "хороший пост"},
+        ])
+
+        output = self.import_posts(path)
+
+        self.assertIn("Импортировано постов: 1, пропущено записей: 5", output)
+        self.assertEqual(
+            list(Post.objects.values_list("text", flat=True)),
+            ["хороший пост"])
+
+    def test_csv_import(self):
+        path = self.write(
+            "posts.csv",
+            "author,text,group,pub_date\n"
+            "author,\"текст, с запятой\",,2020-01-02 03:04:05\n")
+
+        self.import_posts(path)
+
+        post = Post.objects.get()
+        self.assertEqual(post.text, "текст, с запятой")
+        self.assertIsNone(post.group)
+        self.assertEqual(post.pub_date.year, 2020)
+
+    def test_resume_from_checkpoint(self):
+        path = self.write_jsonl([
+            {"author": "author", "text": "уже импортирован"},
+            {"author": "author", "text": "ещё нет"},
+        ])
+        importer.save_checkpoint(importer.checkpoint_name(path), 1)
+
+        output = self.import_posts(path)
+
+        self.assertIn("Продолжение с записи 1", output)
+        self.assertEqual(
+            list(Post.objects.values_list("text", flat=True)), ["ещё нет"])
+
+    def test_failed_batch_keeps_checkpoint_and_posts_together(self):
+        path = self.write_jsonl([
+            {"author": "author", "text": f"пост {number}"}
+            for number in range(4)
+        ])
+        change = counters.change
+        calls = []
+
+        def fail_second_batch(keys, delta):
+            calls.append(keys)
+            if len(calls) > 2:
+                raise RuntimeError("сбой")
+            change(keys, delta)
+
+        with mock.patch(
+                "posts.importer.counters.change", fail_second_batch), \
+                self.assertRaises(RuntimeError):
+            self.import_posts(path, "--batch-size", "2")
+
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(
+            importer.read_checkpoint(importer.checkpoint_name(path)), 2)
+        output = self.import_posts(path, "--batch-size", "2")
+        self.assertIn("Продолжение с записи 2", output)
+        self.assertEqual(
+            sorted(Post.objects.values_list("text", flat=True)),
+            [f"пост {number}" for number in range(4)])
+
+    def test_restart_ignores_checkpoint(self):
+        path = self.write_jsonl([{"author": "author", "text": "text"}])
+        importer.save_checkpoint(importer.checkpoint_name(path), 1)
+
+        self.import_posts(path, "--restart")
+
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_unknown_format_is_rejected(self):
+        path = self.write("posts.txt", "")
+
+        with self.assertRaises(CommandError):
+            self.import_posts(path)
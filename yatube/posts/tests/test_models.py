@@ -68,3 +68,26 @@ class PostModelTest(TestCase):
                 self.assertEqual(
                     post._meta.get_field(field).verbose_name, expected_value
                 )
+
+    def test_excerpt_is_stored_on_save(self):
+        post = PostModelTest.post
+        self.assertEqual(post.excerpt, post.text)
+        self.assertFalse(post.is_excerpt_partial)
+
+        post.text = "слово " * Post.EXCERPT_LEN
+        post.save(update_fields=["text"])
+        post.refresh_from_db()
+
+        self.assertEqual(len(post.excerpt), Post.EXCERPT_LEN)
+        self.assertTrue(post.excerpt.endswith("…"))
+        self.assertTrue(post.text.startswith(post.excerpt[:-1]))
+        self.assertTrue(post.is_excerpt_partial)
+
+    def test_full_text_ending_with_ellipsis_is_not_partial(self):
+        post = PostModelTest.post
+        post.text = "с" * (Post.EXCERPT_LEN - 1) + "…"
+        post.save(update_fields=["text"])
+        post.refresh_from_db()
+
+        self.assertEqual(post.excerpt, post.text)
+        self.assertFalse(post.is_excerpt_partial)
@@ -0,0 +1,221 @@
+import warnings
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import CacheKeyWarning, cache
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from .. import versions
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PublicPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="title",
+            slug="slug",
+            description="description",
+        )
+        cls.other_group = Group.objects.create(
+            title="other title",
+            slug="other_slug",
+            description="other description",
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text="text",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.auth_client = Client()
+        self.auth_client.force_login(PublicPageCacheTests.user)
+
+    def paths(self):
+        post = PublicPageCacheTests.post
+        return {
+            "index": reverse("posts:index"),
+            "group": reverse(
+                "posts:group_list", kwargs={"slug": post.group.slug}),
+            "other_group": reverse(
+                "posts:group_list",
+                kwargs={"slug": PublicPageCacheTests.other_group.slug}),
+            "profile": reverse(
+                "posts:profile", kwargs={"username": post.author.username}),
+            "detail": reverse(
+                "posts:post_detail", kwargs={"post_id": post.id}),
+        }
+
+    def test_cache_hit_skips_database(self):
+        for name, path in self.paths().items():
+            with self.subTest(name=name):
+                first = self.guest_client.get(path)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(path)
+                self.assertEqual(first.content, second.content)
+
+    def test_new_post_invalidates_only_its_pages(self):
+        paths = self.paths()
+        for path in paths.values():
+            self.guest_client.get(path)
+
+        group = PublicPageCacheTests.group
+        self.auth_client.post(
+            reverse("posts:post_create"),
+            data={"text": "new post", "group": group.id},
+        )
+
+        for name in ["index", "group", "profile", "detail"]:
+            with self.subTest(name=name):
+                response = self.guest_client.get(paths[name])
+                self.assertIsNotNone(response.context)
+        with self.assertNumQueries(0):
+            self.guest_client.get(paths["other_group"])
+
+    def test_edited_post_is_shown(self):
+        path = self.paths()["detail"]
+        self.guest_client.get(path)
+        post = Post.objects.get(id=PublicPageCacheTests.post.id)
+        post.text = "edited text"
+        post.save()
+
+        response = self.guest_client.get(path)
+
+        self.assertContains(response, "edited text")
+
+    def test_renamed_group_is_shown_on_post_pages(self):
+        path = self.paths()["detail"]
+        feed_path = reverse("posts:index_rss")
+        self.guest_client.get(path)
+        self.guest_client.get(feed_path)
+        group = Group.objects.get(id=PublicPageCacheTests.group.id)
+        group.title = "new title"
+        group.save()
+
+        self.assertContains(self.guest_client.get(path), "new title")
+        self.assertContains(self.guest_client.get(feed_path), "new title")
+
+    def test_authorized_client_is_served_from_cache(self):
+        for name, path in self.paths().items():
+            with self.subTest(name=name):
+                guest_response = self.guest_client.get(path)
+                with self.assertNumQueries(0):
+                    response = self.auth_client.get(path)
+
+                self.assertEqual(response.content, guest_response.content)
+                self.assertNotIn("Cookie", response.get("Vary", ""))
+                self.assertIn("public", response["Cache-Control"])
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="title",
+            slug="slug",
+            description="description",
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text="text",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.auth_client = Client()
+        self.auth_client.force_login(ConditionalGetTests.user)
+        post = ConditionalGetTests.post
+        self.paths = [
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": post.group.slug}),
+            reverse(
+                "posts:profile", kwargs={"username": post.author.username}),
+            reverse("posts:post_detail", kwargs={"post_id": post.id}),
+        ]
+
+    def test_unchanged_page_is_not_modified(self):
+        for client in [self.client, self.auth_client]:
+            for path in self.paths:
+                with self.subTest(path=path):
+                    etag = client.get(path)["ETag"]
+                    response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, 304)
+                    self.assertEqual(response["ETag"], etag)
+
+    def test_not_modified_from_view_carries_etag(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                etag = self.client.get(path)["ETag"]
+                with mock.patch(
+                        "posts.page_cache.serve_cached", return_value=None):
+                    response = self.client.get(
+                        path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+
+    def test_pages_are_validated_by_etag_only(self):
+        Post.objects.create(author=ConditionalGetTests.user, text="newer")
+        for path in self.paths:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertNotIn("Last-Modified", response)
+        # Удаление не меняет время последней правки оставшихся постов.
+        Post.objects.filter(text="newer").delete()
+        for path in self.paths:
+            with self.subTest(path=path):
+                response = self.client.get(
+                    path, HTTP_IF_MODIFIED_SINCE=http_date())
+                self.assertEqual(response.status_code, 200)
+
+    def test_edit_changes_etag(self):
+        etags = [self.auth_client.get(path)["ETag"] for path in self.paths]
+        post = Post.objects.get(id=ConditionalGetTests.post.id)
+        post.text = "edited text"
+        post.save()
+
+        for path, etag in zip(self.paths, etags):
+            with self.subTest(path=path):
+                response = self.auth_client.get(
+                    path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_group_rename_changes_post_etag(self):
+        path = self.paths[-1]
+        etag = self.client.get(path)["ETag"]
+        group = Group.objects.get(id=ConditionalGetTests.group.id)
+        group.title = "new title"
+        group.save(update_fields=["title"])
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "new title")
+
+
+class VersionKeyTests(SimpleTestCase):
+    def test_keys_are_valid_for_memcached(self):
+        scopes = [
+            versions.author_scope("test user"),
+            versions.author_scope("Тестовый пользователь"),
+            versions.group_scope("slug"),
+        ]
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", CacheKeyWarning)
+            versions.bump(*scopes)
+            found = versions.get_versions(scopes)
+
+        self.assertEqual(set(found), set(scopes))
+        self.assertEqual(
+            len({versions.version_key(scope) for scope in scopes}), 3)
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from ..models import Post
+from ..paginator import CursorPaginator
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f"text_{i}") for i in range(30))
+
+    def test_page_window_is_bounded(self):
+        paginator = CursorPaginator(Post.objects.all(), 1, count=100000)
+        ellipsis = CursorPaginator.ELLIPSIS
+
+        self.assertEqual(
+            paginator.page(50000).page_window,
+            [1, ellipsis, 49998, 49999, 50000, 50001, 50002,
+             ellipsis, 100000],
+        )
+        self.assertEqual(
+            paginator.page(2).page_window,
+            [1, 2, 3, 4, ellipsis, 100000],
+        )
+
+    def test_page_window_lists_all_pages_of_short_feed(self):
+        paginator = CursorPaginator(Post.objects.all(), 10)
+
+        self.assertEqual(paginator.page(1).page_window, [1, 2, 3])
+
+    def test_count_limit_caps_count(self):
+        paginator = CursorPaginator(Post.objects.all(), 10, count_limit=25)
+
+        self.assertEqual(paginator.count, 25)
+        self.assertTrue(paginator.count_is_estimate)
+
+    def test_count_below_limit_is_exact(self):
+        paginator = CursorPaginator(Post.objects.all(), 10, count_limit=100)
+
+        self.assertEqual(paginator.count, 30)
+        self.assertFalse(paginator.count_is_estimate)
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.bench import SKIPPED, url_patterns
+from core.querylog import record_queries
+
+from ..models import Follow, Group, Post, User
+from ..query_budgets import QUERY_BUDGETS
+
+PAGE_SIZES = (1, 50)
+QUERIES = {"posts:search": {"q": "пост"}}
+
+
+@override_settings(POSTS_FANOUT_ASYNC=False)
+class QueryBudgetTests(TestCase):
+    """Каждая страница укладывается в бюджет запросов при любом размере.
+
+    Посты принадлежат разным авторам и группам, поэтому обращение
+    к связанному объекту без select_related даст запрос на каждый пост.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = [
+            User.objects.create_user(username=f"author{number}")
+            for number in range(5)
+        ]
+        groups = [
+            Group.objects.create(
+                title=f"title {number}",
+                slug=f"slug{number}",
+                description="description",
+            )
+            for number in range(3)
+        ]
+        cls.user = authors[0]
+        for author in authors[1:]:
+            Follow.objects.create(user=cls.user, author=author)
+        # Страниц из max(PAGE_SIZES) постов хватает на каждую ленту.
+        for number in range(max(PAGE_SIZES) * 4):
+            Post.objects.create(
+                author=cls.user if number % 2 else authors[number % 5],
+                group=groups[number % 3] if number % 4 else None,
+                text=f"пост {number}",
+            )
+        cls.kwargs = {
+            "slug": groups[1].slug,
+            "username": cls.user.username,
+            "post_id": Post.objects.filter(author=cls.user).first().id,
+        }
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(QueryBudgetTests.user)
+
+    def record(self, name, page_size):
+        path = reverse(name, kwargs={
+            argument: QueryBudgetTests.kwargs[argument]
+            for argument in dict(url_patterns(("posts",)))[name]
+        })
+        with mock.patch("posts.views.POSTS_PER_PAGE", page_size), \
+                self.settings(
+                    POSTS_API_PAGE_SIZE=page_size,
+                    POSTS_FEED_ITEMS=page_size):
+            cache.clear()
+            with record_queries() as recorder:
+                response = self.client.get(path, QUERIES.get(name, {}))
+                if response.streaming:
+                    b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, name)
+        return recorder
+
+    def test_every_view_has_budget(self):
+        names = {
+            name for name, _ in url_patterns(("posts",))
+            if name not in SKIPPED
+        }
+
+        self.assertEqual(set(QUERY_BUDGETS), names)
+
+    def test_views_stay_within_budget(self):
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(name=name):
+                small, large = (
+                    self.record(name, size) for size in PAGE_SIZES)
+                self.assertEqual(
+                    len(small), len(large),
+                    f"Число запросов зависит от размера страницы.\n"
+                    f"{PAGE_SIZES[0]}:\n{small.report()}\n"
+                    f"{PAGE_SIZES[1]}:\n{large.report()}")
+                self.assertLessEqual(
+                    len(large), budget,
+                    f"Бюджет {budget} превышен:\n{large.report()}")
@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..admin import PostAdmin
+from ..models import Post
+from ..search import FTS_TABLE, search_posts
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=text)
+            for text in [
+                "Кот сидит на окне",
+                "Кот и кот, и ещё раз кот",
+                "Собака лает",
+            ]
+        ]
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_search_ranks_matching_posts(self):
+        results = search_posts("кот")
+
+        self.assertEqual(results.count(), 2)
+        self.assertEqual(results[0:10][0], PostSearchTests.posts[1])
+
+    def test_search_matches_prefix(self):
+        self.assertEqual(search_posts("соба").count(), 1)
+
+    def test_edit_and_delete_update_index(self):
+        post = Post.objects.get(id=PostSearchTests.posts[2].id)
+        post.text = "Лошадь скачет"
+        post.save()
+        self.assertEqual(search_posts("собака").count(), 0)
+        self.assertEqual(search_posts("лошадь").count(), 1)
+
+        post.delete()
+        self.assertEqual(search_posts("лошадь").count(), 0)
+
+    def test_search_view_paginates_results(self):
+        response = self.guest_client.get(
+            reverse("posts:search"), {"q": "кот"})
+
+        self.assertTemplateUsed(response, "posts/search.html")
+        self.assertEqual(len(response.context["page_obj"]), 2)
+
+    def test_empty_query_finds_nothing(self):
+        response = self.guest_client.get(reverse("posts:search"))
+
+        self.assertEqual(len(response.context["page_obj"]), 0)
+
+    def test_rebuild_restores_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(search_posts("кот").count(), 2)
+
+    def test_admin_search_uses_index(self):
+        post_admin = PostAdmin(Post, admin.site)
+
+        queryset, _ = post_admin.get_search_results(
+            None, Post.objects.all(), "собака")
+
+        self.assertEqual(list(queryset), [PostSearchTests.posts[2]])
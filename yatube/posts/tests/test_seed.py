@@ -0,0 +1,78 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from .. import counters
+from ..models import Group, Post, User
+from ..search import search_posts
+from ..seed import DEFAULT_END, zipf_cum_weights
+
+
+class SeedCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def seed(self, *args):
+        out = StringIO()
+        call_command(
+            "seed", "--users", "20", "--groups", "5", "--posts", "500",
+            "--batch-size", "128", *args, stdout=out)
+        return out.getvalue()
+
+    def snapshot(self):
+        return list(
+            Post.objects
+            .order_by("id")
+            .values_list(
+                "text", "pub_date", "author__username",
+                "author__first_name", "group__slug", "group__title"))
+
+    def clear(self):
+        Post.objects.all().delete()
+        Group.objects.all().delete()
+        User.objects.all().delete()
+
+    def test_same_seed_gives_same_data(self):
+        self.seed("--seed", "7")
+        first = self.snapshot()
+        self.clear()
+
+        self.seed("--seed", "7")
+
+        self.assertEqual(self.snapshot(), first)
+        self.clear()
+        self.seed("--seed", "8")
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_posts_are_skewed_and_counted(self):
+        output = self.seed("--ungrouped", "0.5")
+
+        self.assertIn("записей/с", output)
+        per_author = sorted(
+            Post.objects.order_by().values("author")
+            .annotate(n=Count("id")).values_list("n", flat=True),
+            reverse=True)
+        self.assertGreater(per_author[0], 5 * per_author[len(per_author) // 2])
+        self.assertTrue(Post.objects.filter(group=None).exists())
+        self.assertEqual(counters.get_count(counters.ALL_POSTS), 500)
+        self.assertEqual(counters.recount(), 0)
+        word = Post.objects.first().text.split()[0]
+        self.assertTrue(search_posts(word).count())
+
+    def test_dates_grow_with_ids(self):
+        self.seed()
+
+        dates = list(
+            Post.objects.order_by("id").values_list("pub_date", flat=True))
+        self.assertEqual(dates, sorted(dates))
+        self.assertLessEqual(dates[-1], DEFAULT_END)
+        self.assertGreater(dates[0], DEFAULT_END - timedelta(days=366))
+
+    def test_zipf_weights(self):
+        weights = zipf_cum_weights(3, 1)
+
+        self.assertEqual(weights, [1, 1.5, 1.5 + 1 / 3])
@@ -1,9 +1,13 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 
 from ..models import Post, Group
+from ..paginator import encode_cursor
 from ..views import POSTS_PER_PAGE
 
 User = get_user_model()
@@ -34,6 +38,7 @@ class PostViewTests(TestCase):
             cls.posts[post.id] = post
 
     def setUp(self):
+        cache.clear()
         self.auth_client = Client()
         self.auth_client.force_login(PostViewTests.user)
 
@@ -83,6 +88,94 @@ class PostViewTests(TestCase):
             PostViewTests.TOTAL_POSTS_COUNT - PostViewTests.POSTS_PER_PAGE,
         )
 
+    def test_home_cursor_pages_match_numbered_pages(self):
+        path = reverse("posts:index")
+        first_page = self.client.get(path).context["page_obj"]
+        second_page = self.client.get(path + "?page=2").context["page_obj"]
+
+        response = self.client.get(
+            path + f"?after={first_page.next_cursor}")
+        after_page = response.context["page_obj"]
+        self.assertEqual(
+            [post.id for post in after_page],
+            [post.id for post in second_page],
+        )
+        self.assertFalse(after_page.has_next())
+        self.assertTrue(after_page.has_previous())
+
+        response = self.client.get(
+            path + f"?before={after_page.previous_cursor}")
+        before_page = response.context["page_obj"]
+        self.assertEqual(
+            [post.id for post in before_page],
+            [post.id for post in first_page],
+        )
+        self.assertTrue(before_page.has_next())
+        self.assertFalse(before_page.has_previous())
+
+    def test_feed_pages_skip_count_query(self):
+        path = reverse("posts:index")
+        cursor = self.client.get(path).context["page_obj"].next_cursor
+
+        for query in ["?page=2", f"?after={cursor}"]:
+            with self.subTest(query=query):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(path + query)
+                self.assertFalse(any(
+                    "COUNT(" in query["sql"] for query in queries))
+
+    def test_feed_pages_read_card_fields_only(self):
+        long_post = Post.objects.create(
+            author=self.user, group=self.group,
+            text="длинный текст " * Post.EXCERPT_LEN)
+        pages = [
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": self.user.username}),
+        ]
+        for path in pages:
+            with self.subTest(path=path):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(path)
+                sql, = [
+                    query["sql"] for query in queries
+                    if '"posts_post"."excerpt"' in query["sql"]]
+
+                self.assertNotIn('"posts_post"."text"', sql)
+                self.assertNotIn("password", sql)
+                self.assertNotIn("description", sql)
+                self.assertNotContains(response, long_post.text)
+                self.assertContains(response, long_post.excerpt)
+                self.assertContains(response, reverse(
+                    "posts:post_detail", kwargs={"post_id": long_post.id}))
+
+    def test_empty_cursor_pages_link_back(self):
+        newest = encode_cursor(Post.objects.first())
+        oldest = encode_cursor(Post.objects.last())
+        pages = [
+            reverse("posts:index"),
+            reverse("posts:profile", kwargs={"username": self.user.username}),
+        ]
+        for path in pages:
+            with self.subTest(path=path):
+                response = self.client.get(path + f"?before={newest}")
+                page = response.context["page_obj"]
+                self.assertEqual(len(page), 0)
+                self.assertFalse(page.has_previous())
+                self.assertContains(response, f"?after={newest}")
+
+                response = self.client.get(path + f"?after={oldest}")
+                page = response.context["page_obj"]
+                self.assertEqual(len(page), 0)
+                self.assertFalse(page.has_next())
+                self.assertContains(response, f"?before={oldest}")
+
+    def test_home_broken_cursor_returns_first_page(self):
+        response = self.client.get(reverse("posts:index") + "?after=broken")
+
+        self.assertEqual(response.context["page_obj"].number, 1)
+
     def test_group_list_page_show_correct_context(self):
         group = PostViewTests.group
         response = self.auth_client.get(
@@ -236,11 +329,13 @@ class PostViewTests(TestCase):
             reverse("posts:group_list", kwargs={"slug": group.slug}),
             reverse("posts:profile", kwargs={"username": user.username}),
         ]
+        post = Post.objects.latest("id")
+        self.assertEqual(post.text, form_data["text"])
+        self.assertEqual(post.group.id, form_data["group"])
         for path in paths:
+            # Страницы могут прийти из общего кеша, без контекста.
             response = self.auth_client.get(path)
-            post = response.context["page_obj"][0]
-            self.assertEqual(post.text, form_data["text"])
-            self.assertEqual(post.group.id, form_data["group"])
+            self.assertContains(response, form_data["text"])
 
     def test_created_post_not_appears_on_another_group_page(self):
         new_group = Group.objects.create(
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, feeds, fragments, views
 
 app_name = 'posts'
 
@@ -8,6 +8,59 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('search/', views.search, name='search'),
+    path(
+        'profile/<str:username>/export/',
+        views.profile_export,
+        name='profile_export'
+    ),
+    path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'profile/<str:username>/follow/',
+        views.profile_follow,
+        name='profile_follow'
+    ),
+    path(
+        'profile/<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow'
+    ),
+    path('api/v1/posts/', api.index, name='api_index'),
+    path('api/v1/group/<slug:slug>/', api.group_posts, name='api_group_list'),
+    path(
+        'api/v1/profile/<str:username>/',
+        api.profile,
+        name='api_profile'
+    ),
+    path(
+        'api/v1/posts/<int:post_id>/',
+        api.post_detail,
+        name='api_post_detail'
+    ),
+    path('feed/', feeds.index_rss, name='index_rss'),
+    path('feed/atom/', feeds.index_atom, name='index_atom'),
+    path('group/<slug:slug>/feed/', feeds.group_rss, name='group_rss'),
+    path(
+        'group/<slug:slug>/feed/atom/',
+        feeds.group_atom,
+        name='group_atom'
+    ),
+    path(
+        'profile/<str:username>/feed/',
+        feeds.author_rss,
+        name='profile_rss'
+    ),
+    path(
+        'profile/<str:username>/feed/atom/',
+        feeds.author_atom,
+        name='profile_atom'
+    ),
+    path('fragments/nav/', fragments.nav, name='nav_fragment'),
+    path(
+        'fragments/profile/<str:username>/',
+        fragments.profile_actions,
+        name='profile_fragment'
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
 ]
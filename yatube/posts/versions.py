@@ -0,0 +1,68 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+
+# Версия всего сайта: растёт, когда меняется то, что видно на любой
+# странице, например имя автора, адрес или название группы.
+SITE = "site"
+INDEX = "index"
+
+# Страницы адресуются слагом группы и именем автора, поэтому и версии
+# их лент ведутся по ним: попадание в кеш проверяется без запроса к базе.
+
+
+def post_key(post_id):
+    return f"post:{post_id}"
+
+
+def author_scope(username):
+    return f"author:{username}"
+
+
+def group_scope(slug):
+    return f"group:{slug}"
+
+
+def feed_scopes(username, slug):
+    """Области лент, в которые входит пост автора username из группы slug."""
+    scopes = [INDEX, author_scope(username)]
+    if slug is not None:
+        scopes.append(group_scope(slug))
+    return scopes
+
+
+def version_key(scope):
+    # Имя автора и слаг могут содержать пробелы и любые символы Unicode,
+    # недопустимые в ключах memcached, поэтому область хешируется,
+    # как в make_template_fragment_key.
+    digest = hashlib.md5(scope.encode()).hexdigest()
+    return f"posts:version:{digest}"
+
+
+def initial_version():
+    # После вытеснения версии из кеша счёт начинается не с нуля,
+    # иначе она совпала бы со старой версией закешированной страницы.
+    return int(time.time() * 1000)
+
+
+def get_versions(scopes):
+    """Текущие версии областей одним обращением к кешу."""
+    keys = {version_key(scope): scope for scope in scopes}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, scope in keys.items():
+        if key not in found:
+            cache.add(key, initial_version(), None)
+            found[key] = cache.get(key)
+        versions[scope] = found[key]
+    return versions
+
+
+def bump(*scopes):
+    """Делает устаревшими все кеши, зависящие от scopes."""
+    for scope in set(scopes):
+        try:
+            cache.incr(version_key(scope))
+        except ValueError:
+            cache.add(version_key(scope), initial_version(), None)
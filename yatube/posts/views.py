@@ -1,63 +1,112 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils.http import urlencode
 
-from .models import Post, User, Group
+from . import counters, exporter, versions
+from .conditional import conditional_page, feed_last_modified, not_modified
+from .follow import FollowFeed
+from .models import Follow, Post, User, Group
 from .forms import PostForm
+from .page_cache import cache_public_page, depend_on
+from .paginator import CursorPaginator
+from .search import search_posts
 
 POSTS_PER_PAGE: int = 10
 
 
-def page_obj(post_list, page_number):
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
-    return paginator.get_page(page_number)
+def page_obj(post_list, query, count=None, use_cursors=True,
+             numbered=True):
+    paginator = CursorPaginator(
+        post_list, POSTS_PER_PAGE,
+        count=count, count_limit=settings.POSTS_COUNT_LIMIT,
+        use_cursors=use_cursors, numbered=numbered)
+    if not numbered or (
+            use_cursors and ("after" in query or "before" in query)):
+        return paginator.cursor_page(
+            after=query.get("after"), before=query.get("before"))
+    return paginator.get_page(query.get("page"))
 
 
+@cache_public_page
+@conditional_page
 def index(request):
-    post_list = Post.objects.select_related("group", "author").all()
+    depend_on(request, versions.INDEX)
+    post_list = Post.objects.index_feed()
+    post_count = counters.get_count(counters.ALL_POSTS)
+
+    response = not_modified(
+        request, feed_last_modified(post_list), post_count)
+    if response is not None:
+        return response
 
     context = {
-        "page_obj": page_obj(post_list, request.GET.get("page")),
+        "page_obj": page_obj(post_list, request.GET, post_count),
     }
     return render(request, "posts/index.html", context)
 
 
+@cache_public_page
+@conditional_page
 def group_posts(request, slug):
+    depend_on(request, versions.group_scope(slug))
     group = get_object_or_404(Group, slug=slug)
 
-    post_list = Post.objects.select_related("author").filter(group=group).all()
+    post_list = Post.objects.group_feed(group)
+    post_count = counters.get_count(counters.group_key(group.id))
+
+    response = not_modified(
+        request, feed_last_modified(post_list), post_count,
+        group.title, group.description)
+    if response is not None:
+        return response
 
     context = {
         "group": group,
-        "page_obj": page_obj(post_list, request.GET.get("page")),
+        "post_count": post_count,
+        "page_obj": page_obj(post_list, request.GET, post_count),
     }
     return render(request, "posts/group_list.html", context)
 
 
+@cache_public_page
+@conditional_page
 def profile(request, username):
+    depend_on(request, versions.author_scope(username))
     author = get_object_or_404(User, username=username)
 
-    post_count = Post.objects.filter(author=author).count()
+    post_count = counters.get_count(counters.author_key(author.id))
+
+    post_list = Post.objects.author_feed(author)
 
-    post_list = (
-        Post.objects
-        .select_related("author", "group")
-        .filter(author=author)
-        .all())
+    response = not_modified(
+        request, feed_last_modified(post_list), post_count)
+    if response is not None:
+        return response
 
     context = {
         "post_count": post_count,
         "author": author,
-        "page_obj": page_obj(post_list, request.GET.get("page")),
+        "page_obj": page_obj(post_list, request.GET, post_count),
     }
     return render(request, "posts/profile.html", context)
 
 
+@cache_public_page
+@conditional_page
 def post_detail(request, post_id):
+    depend_on(request, versions.post_key(post_id))
     post = get_object_or_404(
         Post.objects.select_related("author", "group"), id=post_id)
+    # Число постов автора на странице меняется с каждым его новым постом.
+    depend_on(request, versions.author_scope(post.author.username))
 
-    post_count = Post.objects.filter(author=post.author).count()
+    post_count = counters.get_count(counters.author_key(post.author_id))
+
+    response = not_modified(request, post.edit_date, post_count)
+    if response is not None:
+        return response
 
     context = {
         "post": post,
@@ -66,6 +115,62 @@ def post_detail(request, post_id):
     return render(request, "posts/post_detail.html", context)
 
 
+def search(request):
+    query = request.GET.get("q", "").strip()
+
+    context = {
+        "query": query,
+        "page_query": urlencode({"q": query}) + "&",
+        "page_obj": page_obj(
+            search_posts(query), request.GET, use_cursors=False),
+    }
+    return render(request, "posts/search.html", context)
+
+
+@login_required
+def follow_index(request):
+    context = {
+        # Число постов в ленте подписок не хранится: его подсчёт
+        # читал бы каждый источник целиком, поэтому только курсоры.
+        "page_obj": page_obj(
+            FollowFeed(request.user), request.GET, numbered=False),
+    }
+    return render(request, "posts/follow.html", context)
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect("posts:profile", username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    for follow in Follow.objects.filter(user=request.user, author=author):
+        follow.delete()
+    return redirect("posts:profile", username=username)
+
+
+@login_required
+def profile_export(request, username):
+    if request.user.username != username:
+        return redirect("posts:profile", username=username)
+
+    file_format = request.GET.get("format")
+    if file_format not in exporter.FORMATS:
+        file_format = "jsonl"
+    response = StreamingHttpResponse(
+        exporter.export_lines(
+            exporter.export_queryset(author=request.user), file_format),
+        content_type=exporter.CONTENT_TYPES[file_format])
+    response["Content-Disposition"] = (
+        f'attachment; filename="{username}-posts.{file_format}"')
+    return response
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None)
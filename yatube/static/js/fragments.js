@@ -0,0 +1,10 @@
+// Подставляет персональные фрагменты в страницы, общие для всех посетителей.
+document.querySelectorAll("template[data-fragment]").forEach(function (place) {
+  fetch(place.dataset.fragment, {credentials: "same-origin"})
+    .then(function (response) {
+      return response.ok ? response.text() : "";
+    })
+    .then(function (html) {
+      place.outerHTML = html;
+    });
+});
@@ -1,6 +1,9 @@
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
 from django.contrib.auth import get_user_model
 
+from core import jobs
+
+from .tasks import send_password_reset
 
 User = get_user_model()
 
@@ -10,3 +13,29 @@ class CreationForm(UserCreationForm):
         model = User
 
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Сброс пароля, письмо которого отправляет очередь задач.
+
+    В задачу попадает только пользователь и адрес сайта: ссылка
+    с токеном строится при отправке и не хранится в очереди.
+    Письмо подписывает default_token_generator.
+    """
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        jobs.enqueue(
+            send_password_reset,
+            priority=jobs.HIGH,
+            user_id=context["user"].pk,
+            to_email=to_email,
+            from_email=from_email,
+            domain=context["domain"],
+            site_name=context["site_name"],
+            protocol=context["protocol"],
+            subject_template_name=subject_template_name,
+            email_template_name=email_template_name,
+            html_email_template_name=html_email_template_name,
+        )
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMultiAlternatives
+from django.template import loader
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from core import jobs
+
+
+@jobs.task
+def send_email(subject, body, from_email, to, html_body=None):
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body is not None:
+        message.attach_alternative(html_body, "text/html")
+    message.send()
+
+
+@jobs.task
+def send_password_reset(user_id, to_email, from_email, domain, site_name,
+                        protocol, subject_template_name, email_template_name,
+                        html_email_template_name=None):
+    """Письмо сброса пароля, как его строит PasswordResetForm.
+
+    Ссылка со свежим токеном создаётся здесь же, поэтому в аргументах
+    задачи в таблице очереди её нет.
+    """
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is None or not user.is_active or not user.has_usable_password():
+        return
+    context = {
+        "email": to_email,
+        "domain": domain,
+        "site_name": site_name,
+        "uid": urlsafe_base64_encode(force_bytes(user.pk)),
+        "user": user,
+        "token": default_token_generator.make_token(user),
+        "protocol": protocol,
+    }
+    subject = loader.render_to_string(subject_template_name, context)
+    html_body = None
+    if html_email_template_name is not None:
+        html_body = loader.render_to_string(html_email_template_name, context)
+    send_email(
+        "".join(subject.splitlines()),
+        loader.render_to_string(email_template_name, context),
+        from_email, [to_email], html_body)
@@ -10,6 +10,7 @@ from django.contrib.auth.views import (
 )
 from django.urls import path
 
+from .forms import QueuedPasswordResetForm
 from .views import SignUp
 
 app_name = 'users'
@@ -37,7 +38,8 @@ urlpatterns = [
     path(
         'password_reset/',
         PasswordResetView.as_view(
-            template_name='users/password_reset_form.html'),
+            template_name='users/password_reset_form.html',
+            form_class=QueuedPasswordResetForm),
         name='password_reset'
     ),
     path(
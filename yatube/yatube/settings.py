@@ -48,7 +48,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.QueryLogMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -61,7 +65,8 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Шаблонизатор Django с замером времени отрисовки для метрик.
+        'BACKEND': 'core.metrics.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -86,9 +91,75 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Сколько секунд ждать снятия блокировки записи (busy timeout).
+        'OPTIONS': {'timeout': 20},
+        # Соединение переживает запрос и переиспользуется следующими.
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Выполняются на каждом новом соединении с SQLite. WAL позволяет читать
+# во время записи, synchronous=NORMAL в режиме WAL не теряет целостность.
+# Пустой словарь оставляет стандартные настройки SQLite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+# Реплики только для чтения. Чтобы читать ленты со второго файла SQLite,
+# который копируется с основного, добавьте:
+# DATABASES['replica'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+#     'TEST': {'MIRROR': 'default'},
+# }
+# DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+# Сколько секунд после записи пользователь читает с основной базы.
+DATABASE_PIN_SECONDS = 10
+DATABASE_PIN_COOKIE = 'db_pin'
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+# Кеш в памяти процесса не виден другим процессам. Для нескольких
+# воркеров укажите общий кеш, например Memcached:
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+#         'LOCATION': '127.0.0.1:11211',
+#     }
+# }
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+PROCESS_LOCAL_CACHES = ['django.core.cache.backends.locmem.LocMemCache']
+
+# С общим кешем сессии и пользователь запроса читаются из него,
+# см. core.sessions и core.auth. С кешем процесса выход или смена
+# пароля не видны другим процессам, поэтому сессии остаются в базе;
+# проверка core.E001 не даст включить их вручную.
+if CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+else:
+    SESSION_ENGINE = 'core.sessions'
+    # ModelBackend после кешируемого обслуживает сессии, открытые
+    # до его включения: в них записан путь ModelBackend.
+    AUTHENTICATION_BACKENDS = [
+        'core.auth.CachedModelBackend',
+        'django.contrib.auth.backends.ModelBackend',
+    ]
+# Сколько секунд пользователь живёт в кеше. Запись через save()
+# обновляет кеш сразу, срок ограничивает устаревание после update().
+AUTH_USER_CACHE_TIMEOUT = 15 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -136,3 +207,97 @@ LOGIN_REDIRECT_URL = 'posts:index'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+
+# Posts
+
+# Сколько секунд значения счётчиков постов живут в кеше.
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 60
+# Граница подсчёта постов для лент без счётчика; None - считать точно.
+POSTS_COUNT_LIMIT = 10000
+# Сколько секунд отрисованные карточки постов живут в кеше.
+POSTS_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+# Сколько секунд страницы лент для анонимных посетителей живут в кеше.
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 60
+# Рассылать новые посты по лентам подписчиков через очередь задач
+# (manage.py run_worker); False - прямо в запросе.
+POSTS_FANOUT_ASYNC = True
+POSTS_FANOUT_BATCH_SIZE = 1000
+# Посты авторов с большим числом подписчиков не рассылаются,
+# а читаются лентой подписок напрямую.
+POSTS_FANOUT_MAX_FOLLOWERS = 10000
+# Сколько последних постов автора попадает в ленту нового подписчика.
+POSTS_FOLLOW_BACKFILL = 100
+# Постов на странице JSON API по умолчанию и наибольшее значение limit.
+POSTS_API_PAGE_SIZE = 20
+POSTS_API_MAX_PAGE_SIZE = 100
+# Сколько последних постов попадает в RSS и Atom ленты.
+POSTS_FEED_ITEMS = 20
+
+
+# Fragments
+# Как страницы, общие для всех, получают персональные части (шапку,
+# кнопки подписки): "js" - static/js/fragments.js после загрузки,
+# "esi" - тег <esi:include> для прокси вроде Varnish.
+FRAGMENTS_MODE = 'js'
+
+
+# Jobs
+# Очередь задач в базе, выполняет manage.py run_worker.
+JOBS_BATCH_SIZE = 20
+JOBS_POLL_INTERVAL = 1.0
+JOBS_MAX_ATTEMPTS = 5
+# Пауза перед повтором: JOBS_RETRY_DELAY * 2^(попытка - 1) секунд,
+# но не больше JOBS_RETRY_MAX_DELAY.
+JOBS_RETRY_DELAY = 10
+JOBS_RETRY_MAX_DELAY = 60 * 60
+# Через сколько секунд задачи молчащего воркера забирают другие.
+JOBS_CLAIM_TIMEOUT = 5 * 60
+
+
+# Metrics
+# Метрики в формате Prometheus на /metrics.
+METRICS_ENABLED = True
+# Каталог, через который складываются метрики нескольких процессов.
+# None - /metrics показывает только обслуживший его процесс: метрики
+# других воркеров gunicorn и очереди задач (run_worker) туда не
+# попадают. Для них укажите каталог, общий для всех процессов сайта,
+# например os.path.join(BASE_DIR, 'metrics'), и очищайте его перед
+# запуском. Без каталога run_worker предупреждает об этом при старте.
+METRICS_DIR = None
+# Как часто процесс сохраняет свои значения в METRICS_DIR, секунды.
+METRICS_FLUSH_SECONDS = 5
+# Адреса, которым отдаётся /metrics; None - всем.
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+
+# Query log
+# Доля запросов, за SQL которых следит журнал; 0 выключает журнал.
+QUERYLOG_SAMPLE_RATE = 0.1
+# Запросы не быстрее этого числа миллисекунд пишутся в журнал.
+QUERYLOG_SLOW_MS = 100
+# Столько запросов одной формы за ответ считаются признаком N+1.
+QUERYLOG_REPEAT_THRESHOLD = 5
+
+# Profiling
+# Профили запросов: .prof для pstats/snakeviz и .collapsed для flamegraph.
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+# Старые профили удаляются, когда каталог превышает этот размер.
+PROFILING_MAX_BYTES = 100 * 1024 * 1024
+# Профилировать случайный запрос из каждых N; 0 - только по токену.
+PROFILING_SAMPLE_EVERY = 0
+# Сколько секунд действует токен из команды profile_token.
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+# Как часто снимается стек для .collapsed, миллисекунды.
+PROFILING_INTERVAL_MS = 1
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.queries': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}